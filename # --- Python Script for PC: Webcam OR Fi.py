@@ -2,41 +2,76 @@
 # Filename: smart_analyzer_pc.py
 
 import cv2
-import google.generativeai as genai
+import numpy as np # Frame differencing for auto-capture mode (installed with opencv-python)
 import PIL.Image
+import PIL.ImageOps
+import io
+import json # Server-mode results are handed to the shared parser as JSON
 import os
+import sys
+import queue # Hands captured frames to the background analysis threads
+import random
+import threading
 import time
 import textwrap # For wrapping long text lines on screen
+from concurrent.futures import ThreadPoolExecutor, as_completed # Concurrent uploads in file mode
+
+# Prompt, JSON response schema and strict parser shared with the Flask server (hnwebv7/model_output.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hnwebv7'))
+from model_output import GENERATION_CONFIG, IMAGE_ANALYSIS_PROMPT, format_result, parse_result
 
 # --- Configuration & AI Model Setup ---
 # !!! IMPORTANT: Make sure GOOGLE_API_KEY environment variable is set BEFORE running !!!
-try:
-    # 1. GET API KEY: Reads the key you set in your terminal environment.
-    GOOGLE_API_KEY = os.environ['GOOGLE_API_KEY']
-    # 2. CONFIGURE LIBRARY: Tells the Google AI library to use your key.
-    genai.configure(api_key=GOOGLE_API_KEY)
-    # 3. INITIALIZE MODEL: Connects to a specific Gemini model capable of understanding images.
-    #    'gemini-1.5-flash-latest' is a good, fast vision model (as of early 2025).
-    #    Check Google AI documentation for the latest recommended vision models.
-    model = genai.GenerativeModel('gemini-1.5-flash-latest')
-    print("AI Model loaded successfully.") # Confirmation message
-except KeyError:
-    # Handles error if the API key wasn't set in the environment.
-    print("\n############################################################")
-    print("ERROR: GOOGLE_API_KEY environment variable not set.")
-    print("Please set the environment variable and run the script again.")
-    print("How to set (examples):")
-    print("  Linux/macOS: export GOOGLE_API_KEY='Your_Key_Here'")
-    print("  Windows CMD: set GOOGLE_API_KEY=Your_Key_Here")
-    print("  Windows PowerShell: $env:GOOGLE_API_KEY='Your_Key_Here'")
-    print("Replace 'Your_Key_Here' with your actual key.")
-    print("############################################################\n")
-    exit() # Stop the script if key is missing.
-except Exception as e:
-    # Handles other errors during setup (e.g., invalid key, network issue).
-    print(f"ERROR: Could not initialize AI model: {e}")
-    print("This might be due to an invalid API key or network issues.")
-    exit() # Stop the script if setup fails.
+# Set SMARTSORT_SERVER_URL (e.g. http://127.0.0.1:5000) to send images to the Flask server's
+# /analyze_image instead of calling Gemini from this script. The server then applies its
+# caching, batching and rate limiting, and no API key is needed on this PC.
+SERVER_URL = os.environ.get('SMARTSORT_SERVER_URL', '').rstrip('/')
+UPLOAD_MAX_EDGE = int(os.environ.get('SMARTSORT_UPLOAD_MAX_EDGE', '1024')) # Images are shrunk to this long edge before sending
+UPLOAD_JPEG_QUALITY = 85
+UPLOAD_WORKERS = int(os.environ.get('SMARTSORT_UPLOAD_WORKERS', '4')) # Files analyzed at the same time when a folder is given
+UPLOAD_RETRIES = 3 # Extra attempts after busy/unavailable answers or dropped connections
+UPLOAD_BACKOFF = 0.5 # Seconds before the first retry; doubles on each further attempt
+UPLOAD_TIMEOUT = 60 # Seconds per request
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+if SERVER_URL:
+    import requests # Only needed in server mode (installed along with google-generativeai)
+    # One keep-alive session for every upload, shared by the worker threads (no new TCP/TLS handshake per image)
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=UPLOAD_WORKERS + 2)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    model = None
+    print(f"Server mode: images go to {SERVER_URL}/analyze_image")
+else:
+    import google.generativeai as genai # Only needed when calling Gemini directly
+    try:
+        # 1. GET API KEY: Reads the key you set in your terminal environment.
+        GOOGLE_API_KEY = os.environ['GOOGLE_API_KEY']
+        # 2. CONFIGURE LIBRARY: Tells the Google AI library to use your key.
+        genai.configure(api_key=GOOGLE_API_KEY)
+        # 3. INITIALIZE MODEL: Connects to a specific Gemini model capable of understanding images.
+        #    'gemini-1.5-flash-latest' is a good, fast vision model (as of early 2025).
+        #    Check Google AI documentation for the latest recommended vision models.
+        model = genai.GenerativeModel('gemini-1.5-flash-latest')
+        print("AI Model loaded successfully.") # Confirmation message
+    except KeyError:
+        # Handles error if the API key wasn't set in the environment.
+        print("\n############################################################")
+        print("ERROR: GOOGLE_API_KEY environment variable not set.")
+        print("Please set the environment variable and run the script again.")
+        print("How to set (examples):")
+        print("  Linux/macOS: export GOOGLE_API_KEY='Your_Key_Here'")
+        print("  Windows CMD: set GOOGLE_API_KEY=Your_Key_Here")
+        print("  Windows PowerShell: $env:GOOGLE_API_KEY='Your_Key_Here'")
+        print("Replace 'Your_Key_Here' with your actual key.")
+        print("############################################################\n")
+        exit() # Stop the script if key is missing.
+    except Exception as e:
+        # Handles other errors during setup (e.g., invalid key, network issue).
+        print(f"ERROR: Could not initialize AI model: {e}")
+        print("This might be due to an invalid API key or network issues.")
+        exit() # Stop the script if setup fails.
 
 # --- Helper Function to Draw Text (for webcam mode) ---
 def draw_text(img, text, pos=(10, 30), scale=0.7, thick=2, color=(255, 255, 255), bg_color=(0, 0, 0)):
@@ -63,27 +98,23 @@ def draw_text(img, text, pos=(10, 30), scale=0.7, thick=2, color=(255, 255, 255)
 
 # --- Function to Analyze Image (Handles the actual AI communication) ---
 def analyze_image_with_ai(image_path):
-    """Opens an image, sends it to Gemini with a prompt, returns the result."""
-    print(f"\nAnalyzing image: {image_path}...")
+    """Sends an image to Gemini with a prompt, returns the result.
+
+    image_path is a file path, or the JPEG bytes of a webcam capture that never touched the disk.
+    """
+    in_memory = isinstance(image_path, bytes)
+    print(f"\nAnalyzing image: {'in-memory capture' if in_memory else image_path}...")
+    if SERVER_URL: return analyze_image_remote(image_path)
     try:
-        # 1. OPEN IMAGE: Uses the Pillow library (PIL) to open the image file.
-        img_pil = PIL.Image.open(image_path)
-
-        # 2. DEFINE PROMPT: Creates the instructions for the AI.
-        prompt = """
-        From the provided image, identify the single, main object clearly visible. State the object's name.
-        Based on common US recycling guidelines (mention rules can vary by location, especially for specific plastics like #3-#7),
-        classify this object as 'Recycling', 'Trash', or 'Uncertain/Check Locally'.
-        Provide a brief reason for the classification (max 1-2 short sentences).
-        Format your response exactly like this, with each part on a new line:
-        Object: [Object Name]
-        Classification: [Recycling/Trash/Uncertain/Check Locally]
-        Reason: [Brief Explanation]
-        """
+        # 1. OPEN IMAGE: Encoded captures go to the API as-is; files are shrunk to UPLOAD_MAX_EDGE with Pillow (PIL).
+        img_pil = {"mime_type": "image/jpeg", "data": image_path if in_memory else shrink_for_upload(image_path)}
+
+        # 2. DEFINE PROMPT: The same instructions the server uses (model_output.IMAGE_ANALYSIS_PROMPT).
 
         # 3. *** CALL GEMINI API ***: This is the key step. Sends the prompt and the image
-        #    data to the Google servers where the Gemini model runs.
-        response = model.generate_content([prompt, img_pil])
+        #    data to the Google servers where the Gemini model runs. GENERATION_CONFIG switches
+        #    on JSON mode, so the answer follows the shared response schema.
+        response = model.generate_content([IMAGE_ANALYSIS_PROMPT, img_pil], generation_config=GENERATION_CONFIG)
 
         # 4. PROCESS RESPONSE: Checks if the AI sent back valid content.
         print("AI analysis complete.")
@@ -114,10 +145,173 @@ def analyze_image_with_ai(image_path):
         return msg
 
 
+# --- Helpers to Shrink Images Before Sending (fewer bytes to upload, same result) ---
+def shrink_for_upload(image_path):
+    """Opens an image file and returns JPEG bytes at most UPLOAD_MAX_EDGE pixels on the long side."""
+    img = PIL.Image.open(image_path)
+    img.draft("RGB", (UPLOAD_MAX_EDGE, UPLOAD_MAX_EDGE)) # Big JPEGs are decoded at reduced size directly
+    img = PIL.ImageOps.exif_transpose(img) # Phone photos: apply the rotation stored in EXIF
+    img.thumbnail((UPLOAD_MAX_EDGE, UPLOAD_MAX_EDGE))
+    buffer = io.BytesIO()
+    img.convert("RGB").save(buffer, "JPEG", quality=UPLOAD_JPEG_QUALITY)
+    return buffer.getvalue()
+
+def shrink_frame(frame):
+    """Downscales a webcam frame (NumPy BGR image) so its long side is at most UPLOAD_MAX_EDGE."""
+    height, width = frame.shape[:2]
+    scale = UPLOAD_MAX_EDGE / max(height, width)
+    if scale >= 1: return frame
+    return cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+
+
+# --- Function to Analyze Image via the Flask Server (server mode) ---
+def analyze_image_remote(image_path):
+    """Uploads to SERVER_URL/analyze_image and returns the same JSON answer as the direct Gemini call."""
+    try:
+        data = image_path if isinstance(image_path, bytes) else shrink_for_upload(image_path)
+    except FileNotFoundError:
+        return f"Error: Image file not found at '{image_path}'"
+    except Exception as e:
+        return f"Error: Could not read image: {e}"
+
+    for attempt in range(UPLOAD_RETRIES + 1):
+        retry_after = 0.0
+        try:
+            response = session.post(f"{SERVER_URL}/analyze_image", files={"image_file": ("image.jpg", data, "image/jpeg")}, timeout=UPLOAD_TIMEOUT)
+            if response.status_code not in RETRY_STATUS_CODES: break
+            problem = f"server answered HTTP {response.status_code}"
+            try: retry_after = float(response.headers.get("Retry-After", 0))
+            except ValueError: pass
+        except requests.RequestException as e: # Connection, timeout, bad URL, broken chunked body, ...
+            problem = f"request failed: {e}"
+        if attempt == UPLOAD_RETRIES:
+            return f"Error: Server did not answer after {UPLOAD_RETRIES + 1} attempts ({problem})"
+        # Exponential backoff with jitter, so many clients do not retry in lockstep
+        delay = max(retry_after, UPLOAD_BACKOFF * 2 ** attempt * random.uniform(0.75, 1.25))
+        print(f"Retrying in {delay:.1f}s ({problem})...")
+        time.sleep(delay)
+
+    try:
+        result = response.json()
+    except ValueError:
+        return f"Error: Server answered HTTP {response.status_code} without a JSON body."
+    if response.status_code != 200 or result.get("error"):
+        return f"Error: {result.get('error') or f'HTTP {response.status_code}'}"
+    if result.get("cache_hit"): print("Result served from the server cache.")
+    return json.dumps({key: result.get(key) for key in ("object", "classification", "reason", "confidence")})
+
+
+# --- Background Analysis Worker (for webcam mode) ---
+ANALYSIS_WORKERS = 2 # Captures analyzed at the same time
+MAX_PENDING_CAPTURES = 8 # Further SPACE presses are refused until some of these finish
+JPEG_QUALITY = 90 # cv2.imencode quality for captures sent to the AI
+
+class AnalysisWorker:
+    """Analyzes captured frames on background threads so the preview loop never waits for the AI."""
+
+    def __init__(self, workers=ANALYSIS_WORKERS, max_pending=MAX_PENDING_CAPTURES):
+        self.jobs = queue.Queue(maxsize=max_pending) # (capture number, JPEG bytes) waiting for a thread
+        self.results = queue.Queue() # (capture number, raw AI result), read by the display loop
+        self.status = {} # capture number -> "pending" or "analyzing", for the on-screen overlay
+        self.lock = threading.Lock()
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f"analysis-{i}", daemon=True).start()
+
+    def submit(self, number, jpeg_bytes):
+        """Queues one capture; returns False (nothing queued) if too many are already waiting."""
+        with self.lock: self.status[number] = "pending"
+        try:
+            self.jobs.put_nowait((number, jpeg_bytes))
+            return True
+        except queue.Full:
+            with self.lock: del self.status[number]
+            return False
+
+    def _run(self):
+        while True:
+            number, jpeg_bytes = self.jobs.get()
+            with self.lock: self.status[number] = "analyzing"
+            analysis_result_raw = analyze_image_with_ai(jpeg_bytes) # Never raises; errors come back as text
+            with self.lock: del self.status[number]
+            self.results.put((number, analysis_result_raw))
+
+    def in_flight(self):
+        """Overlay text such as '#3 analyzing, #4 pending' (empty when idle)."""
+        with self.lock: return ", ".join(f"#{n} {state}" for n, state in sorted(self.status.items()))
+
+
+# --- Motion/Stability Trigger (for auto-capture mode) ---
+# All differences are mean absolute gray levels (0-255) between tiny grayscale frames.
+TRIGGER_SIZE = (64, 48) # Frames are shrunk to this before comparing; cheap and ignores sensor noise
+MOTION_THRESHOLD = 2.5 # Frame-to-frame change above this means something is moving
+STABLE_FRAMES = 8 # Consecutive still frames before the scene counts as settled
+PRESENCE_THRESHOLD = 6.0 # Settled scene this different from the empty background = an item is there
+DUPLICATE_THRESHOLD = 3.0 # New item this close to the previous one is treated as the same kind of item
+
+class MotionTrigger:
+    """Decides, frame by frame, when a new item has entered the view and settled.
+
+    Start with the slot/belt empty: the first settled view becomes the background.
+    update() returns "item" once per settled item, "duplicate" when the settled
+    item looks like the previous one, and None otherwise (moving, empty, waiting).
+    After an "item" the caller reports item_sent() or item_refused(), so an item
+    the worker had no room for is neither remembered nor lost.
+    """
+
+    def __init__(self):
+        self.previous = None # Last small frame, for motion
+        self.background = None # Settled empty scene
+        self.last_item = None # Small frame of the last item sent to the AI
+        self.candidate = None # Small frame of the settled item update() just reported
+        self.still_frames = 0
+        self.moved = True # A decision is made once per settle, after something moved
+        self.state = "waiting"
+
+    def _small(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, TRIGGER_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    @staticmethod
+    def _difference(a, b):
+        return float(np.abs(a - b).mean())
+
+    def update(self, frame):
+        small = self._small(frame)
+        if self.previous is None:
+            self.previous = small
+            return None
+        motion = self._difference(small, self.previous)
+        self.previous = small
+        if motion > MOTION_THRESHOLD:
+            self.still_frames, self.moved, self.state = 0, True, "moving"
+            return None
+        self.still_frames += 1
+        if self.still_frames < STABLE_FRAMES or not self.moved: return None
+        self.moved = False # Settled: decide once, then wait for the next movement
+        if self.background is None or self._difference(small, self.background) < PRESENCE_THRESHOLD:
+            self.background, self.state = small, "empty" # Also follows slow lighting changes
+            return None
+        if self.last_item is not None and self._difference(small, self.last_item) < DUPLICATE_THRESHOLD:
+            self.state = "duplicate"
+            return "duplicate"
+        self.candidate, self.state = small, "item"
+        return "item"
+
+    def item_sent(self):
+        self.last_item = self.candidate # Only now do later look-alikes count as duplicates
+
+    def item_refused(self):
+        self.still_frames, self.moved = 0, True # Decide again once the scene has been still for another STABLE_FRAMES
+
+
 # --- Function to Handle PC Webcam Input ---
-def process_webcam_input():
-    """Runs the live webcam feed, captures images, and analyzes them."""
-    print("\nStarting PC Webcam...")
+def process_webcam_input(auto_capture=False):
+    """Runs the live webcam feed, captures images, and analyzes them in the background.
+
+    With auto_capture=True a MotionTrigger replaces the SPACE key: one frame per
+    settled item is sent to the AI, and repeats of the previous item reuse its result.
+    """
+    print(f"\nStarting PC Webcam{' in auto-capture mode' if auto_capture else ''}...")
     # Access the default webcam (usually index 0).
     cap = cv2.VideoCapture(0)
     # Check if the webcam opened successfully.
@@ -126,11 +320,25 @@ def process_webcam_input():
         return # Exit this function if webcam failed.
 
     # Create and name the display window. Allow resizing.
-    window_name = 'PC Webcam - SPACE: Capture | Q: Quit'
+    window_name = 'PC Webcam - Auto-capture | Q: Quit' if auto_capture else 'PC Webcam - SPACE: Capture | Q: Quit'
     cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-    status_message = "Aim PC webcam, press SPACE to capture."
+    status_message = "Keep the view empty, then drop items in one at a time." if auto_capture else "Aim PC webcam, press SPACE to capture."
     last_result_display = "" # Stores formatted result string
     img_count = 0
+    worker = AnalysisWorker() # Captures are analyzed off the display loop; several can be in flight
+    trigger = MotionTrigger() if auto_capture else None
+    results_by_capture = {} # capture number -> formatted result (for duplicates in auto mode)
+    frames_processed = duplicates_skipped = 0
+    start_time = time.time()
+
+    def capture(frame):
+        """Encodes the frame to JPEG in memory (no temp file) and hands it to the worker; returns (queued, status message)."""
+        nonlocal img_count
+        ok, jpeg = cv2.imencode('.jpg', shrink_frame(frame), [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        if not ok: return False, "Error: Could not encode the captured frame."
+        if not worker.submit(img_count + 1, jpeg.tobytes()): return False, f"Busy: {MAX_PENDING_CAPTURES} captures already waiting, try again shortly."
+        img_count += 1
+        return True, f"Capture #{img_count} queued for analysis."
 
     # Loop continuously to show video frames.
     while True:
@@ -142,11 +350,39 @@ def process_webcam_input():
             print(status_message)
             break # Exit the loop if error.
 
+        # Pick up any analyses that finished since the last frame (never blocks).
+        while True:
+            try: number, analysis_result_raw = worker.results.get_nowait()
+            except queue.Empty: break
+            results_by_capture[number] = parse_and_format_result(analysis_result_raw)
+            last_result_display = f"#{number} " + results_by_capture[number]
+            status_message = f"Capture #{number} complete." + ("" if auto_capture else " Press SPACE for another.")
+
+        # Auto-capture: let the trigger look at every frame; only settled new items reach the AI.
+        if trigger:
+            frames_processed += 1
+            event = trigger.update(frame)
+            if event == "item":
+                queued, status_message = capture(frame)
+                if queued: trigger.item_sent()
+                else: trigger.item_refused()
+                print(status_message)
+            elif event == "duplicate":
+                duplicates_skipped += 1
+                status_message = f"Same as #{img_count}; not sent again."
+                last_result_display = f"#{img_count} (repeat) " + results_by_capture.get(img_count, "result pending")
+
         # Make a copy to draw on, keeping the original frame clean.
         display_frame = frame.copy()
 
-        # Draw status and results onto the display frame.
+        # Draw status, pending captures and results onto the display frame.
         draw_text(display_frame, f"Status: {status_message}", pos=(10, 30))
+        in_flight = worker.in_flight()
+        if in_flight: draw_text(display_frame, f"In progress: {in_flight}", pos=(10, 60), color=(0, 255, 255))
+        if trigger:
+            fps = frames_processed / max(time.time() - start_time, 1e-6)
+            draw_text(display_frame, f"Auto [{trigger.state}]: {fps:.1f} frames/s checked | {img_count} AI calls | {duplicates_skipped} repeats skipped",
+                      pos=(10, 90), scale=0.5, thick=1, color=(0, 255, 0))
         if last_result_display:
             result_y_pos = max(60, display_frame.shape[0] - 90)
             draw_text(display_frame, f"Last Result:\n{last_result_display}", pos=(10, result_y_pos))
@@ -159,42 +395,8 @@ def process_webcam_input():
 
         # --- Handle SPACE key press for capture ---
         if key == ord(' '):
-            img_count += 1
-            filename = f"webcam_capture_{img_count}.jpg" # Temp filename
-
-            # Update status and redraw immediately for user feedback.
-            status_message = f"Capturing as {filename}..."
+            _, status_message = capture(frame)
             print(status_message)
-            temp_frame = frame.copy()
-            draw_text(temp_frame, f"Status: {status_message}", pos=(10, 30))
-            if last_result_display: draw_text(temp_frame, f"Last Result:\n{last_result_display}", pos=(10, temp_frame.shape[0] - 90))
-            cv2.imshow(window_name, temp_frame)
-            cv2.waitKey(1) # Allow screen update
-
-            # Save the current frame to the file.
-            cv2.imwrite(filename, frame)
-
-            # Update status and redraw again before analysis.
-            status_message = f"Analyzing {filename}..."
-            print(status_message)
-            temp_frame = frame.copy()
-            draw_text(temp_frame, f"Status: {status_message}", pos=(10, 30))
-            if last_result_display: draw_text(temp_frame, f"Last Result:\n{last_result_display}", pos=(10, temp_frame.shape[0] - 90))
-            cv2.imshow(window_name, temp_frame)
-            cv2.waitKey(1) # Allow screen update
-
-            # Call the AI analysis function with the saved image path.
-            analysis_result_raw = analyze_image_with_ai(filename)
-            # Parse and format the result for display.
-            last_result_display = parse_and_format_result(analysis_result_raw)
-            # Reset status message.
-            status_message = "Ready. Aim PC webcam, press SPACE."
-
-            # Clean up the temporary image file.
-            try:
-                os.remove(filename)
-            except OSError as e:
-                print(f"Warning: Could not remove temp file {filename}: {e}")
 
         # --- Handle 'q' key press to quit ---
         elif key == ord('q'):
@@ -202,20 +404,45 @@ def process_webcam_input():
             break # Exit the loop.
 
     # Release the webcam and close OpenCV windows when loop ends.
+    # Analyses still in progress run on daemon threads; their results are discarded.
     cap.release()
     cv2.destroyAllWindows()
     print("Webcam resources released.")
+    if trigger:
+        elapsed = max(time.time() - start_time, 1e-6)
+        print(f"Auto-capture: {frames_processed} frames checked ({frames_processed / elapsed:.1f}/s), "
+              f"{img_count} AI calls, {duplicates_skipped} repeats skipped.")
+
+
+# --- Function to Analyze a Whole Folder (file mode) ---
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp')
+
+def process_folder(folder):
+    """Analyzes every image in a folder, UPLOAD_WORKERS at a time, printing results as they finish."""
+    paths = sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.lower().endswith(IMAGE_EXTENSIONS))
+    if not paths:
+        print(f"No images ({', '.join(IMAGE_EXTENSIONS)}) found in '{folder}'.")
+        return
+    print(f"Analyzing {len(paths)} images with {UPLOAD_WORKERS} at a time...")
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as pool:
+        futures = {pool.submit(analyze_image_with_ai, path): path for path in paths}
+        for future in as_completed(futures):
+            print(f"\n--- {os.path.basename(futures[future])} ---")
+            print(parse_and_format_result(future.result()))
+    elapsed = time.time() - start
+    print(f"\nDone: {len(paths)} images in {elapsed:.1f}s ({len(paths) / elapsed:.2f} images/s).")
 
 
 # --- Function to Handle PC File Input ---
 def process_file_input():
-    """Asks user for image file path on PC and analyzes it."""
+    """Asks user for an image file (or a folder of images) on PC and analyzes it."""
     print("\nProcessing Image File from PC...")
     # Loop to allow analyzing multiple files.
     while True:
         try:
             # Get file path from user input.
-            image_path = input("Enter the full path to the image file on your PC (or type 'quit'): ")
+            image_path = input("Enter the full path to the image file or a folder of images on your PC (or type 'quit'): ")
             # Allow user to quit.
             if image_path.lower() == 'quit':
                 break
@@ -223,6 +450,10 @@ def process_file_input():
             if not os.path.exists(image_path):
                 print(f"Error: File not found at '{image_path}'. Please check the path and try again.")
                 continue # Ask for input again.
+            # A folder: analyze all of its images concurrently.
+            if os.path.isdir(image_path):
+                process_folder(image_path)
+                continue
 
             # Call the AI analysis function.
             analysis_result_raw = analyze_image_with_ai(image_path)
@@ -248,31 +479,8 @@ def process_file_input():
 
 # --- Helper to Parse and Format Result String ---
 def parse_and_format_result(analysis_result_raw):
-    """Parses the AI's response string to extract key info."""
-    # Default values
-    object_name = "Unknown"
-    classification = "Unknown"
-    reason = "N/A"
-    try:
-        # Check if the input is already an error/block message
-        if analysis_result_raw.lower().startswith(("error:", "analysis failed:", "analysis blocked:")):
-             return analysis_result_raw # Return the error message directly
-
-        # Split the response into lines.
-        lines = analysis_result_raw.split('\n')
-        # Loop through lines to find keywords.
-        for line in lines:
-            if line.lower().startswith("object:"):
-                object_name = line.split(":", 1)[1].strip()
-            elif line.lower().startswith("classification:"):
-                classification = line.split(":", 1)[1].strip()
-            elif line.lower().startswith("reason:"):
-                reason = line.split(":", 1)[1].strip()
-        # Return a nicely formatted string.
-        return f"Object: {object_name}\nClassification: {classification}\nReason: {reason}"
-    except Exception:
-        # If parsing fails for any other reason, return the raw string.
-        return f"Could not parse result.\nRaw:\n{analysis_result_raw}"
+    """Parses the AI's JSON answer (or an error message) with the shared strict parser and formats it for display."""
+    return format_result(parse_result(analysis_result_raw))
 
 
 # --- Main Script Execution ---
@@ -284,14 +492,17 @@ if __name__ == "__main__":
         print("\nChoose input method:")
         print(" 1: Use PC Webcam")
         print(" 2: Use Image File from PC")
+        print(" 3: Auto-capture with PC Webcam (conveyor / drop slot)")
         print(" q: Quit")
-        choice = input("Enter choice (1, 2, or q): ").lower()
+        choice = input("Enter choice (1, 2, 3, or q): ").lower()
 
         # Call the appropriate function based on user choice.
         if choice == '1':
             process_webcam_input()
         elif choice == '2':
             process_file_input()
+        elif choice == '3':
+            process_webcam_input(auto_capture=True)
         elif choice == 'q':
             print("Exiting.")
             break # Exit the main menu loop.
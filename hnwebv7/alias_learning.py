@@ -0,0 +1,148 @@
+# alias_learning.py - Count /sort misses and promote the frequent ones into learned aliases
+
+# The same misspellings ("pizzza box", "styrofome") arrive over and over, and
+# every one of them pays the term scan plus the fuzzy fallback. MissCounter
+# tracks the most frequent (location, query) misses in bounded memory with the
+# Space-Saving algorithm: at most `capacity` counters, each over-estimating its
+# true count by no more than the `error` it inherited on entry, so anything that
+# occurs more than N / capacity times in a stream of N misses is guaranteed to
+# be present. alias_candidates() pairs the top misses with the fuzzy engine's best
+# rule, and an admin approves them into LearnedAliases: a per-location
+# query -> rule key table that get_sorting_info checks before matching, turning
+# a hot miss into a single dict lookup. Approved aliases are saved to a JSON file.
+
+import difflib
+import json
+import os
+import threading
+
+
+class MissCounter:
+    """Space-Saving heavy-hitters sketch: approximate top-k counts over an unbounded stream of keys."""
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._counts = {}   # key -> [count, error]
+        self._buckets = {}  # count -> set of keys with that count (O(1) minimum eviction)
+        self._min = 0
+        self.total = 0
+
+    def add(self, key):
+        with self._lock:
+            self.total += 1
+            entry = self._counts.get(key)
+            if entry is None and len(self._counts) < self.capacity:
+                entry = self._counts[key] = [0, 0]
+                self._min = 1 # The newcomer's count after the increment below
+            elif entry is None: # Replace one of the least counted keys; the newcomer inherits its count as error
+                victims = self._buckets[self._min]
+                entry = self._counts.pop(victims.pop())
+                entry[1] = entry[0]
+                self._counts[key] = entry
+                if not victims:
+                    del self._buckets[self._min]
+                    self._min += 1
+            else:
+                keys = self._buckets[entry[0]]
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[entry[0]]
+                    if self._min == entry[0]: self._min += 1
+            entry[0] += 1
+            self._buckets.setdefault(entry[0], set()).add(key)
+
+    def discard(self, key):
+        """Forget a key (e.g. once it has been approved as an alias)."""
+        with self._lock:
+            entry = self._counts.pop(key, None)
+            if entry is None: return
+            keys = self._buckets[entry[0]]
+            keys.discard(key)
+            if not keys: del self._buckets[entry[0]]
+            self._min = min(self._buckets) if self._buckets else 0
+
+    def top(self, n=None):
+        """[(key, count, error)] by count, highest first; count - error is a guaranteed lower bound."""
+        with self._lock: items = [(key, count, error) for key, (count, error) in self._counts.items()]
+        items.sort(key=lambda item: item[1], reverse=True)
+        return items if n is None else items[:n]
+
+    def __len__(self):
+        return len(self._counts)
+
+
+class LearnedAliases:
+    """Approved per-location query -> rule key mappings, persisted to a JSON file ({location: {query: rule}})."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._tables = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f: data = json.load(f)
+            if not isinstance(data, dict) or not all(isinstance(t, dict) for t in data.values()):
+                raise ValueError(f"{path}: expected {{location: {{query: rule}}}}")
+            self._tables = {location: dict(table) for location, table in data.items()}
+
+    def table(self, location):
+        """The location's query -> rule dict (do not mutate; approve/revoke replace it)."""
+        return self._tables.get(location)
+
+    def approve(self, location, query, target):
+        self._update(location, lambda table: table.__setitem__(query, target))
+
+    def revoke(self, location, query):
+        removed = []
+        self._update(location, lambda table: removed.append(table.pop(query, None)))
+        return removed[0] is not None
+
+    def _update(self, location, change):
+        # Copy-on-write: request threads keep reading the old dict until the new one is published
+        with self._lock:
+            table = dict(self._tables.get(location, {}))
+            change(table)
+            tables = {**self._tables, location: table}
+            if not table: del tables[location]
+            if self.path:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f: json.dump(tables, f, indent=2, sort_keys=True)
+                os.replace(tmp, self.path)
+            self._tables = tables
+
+    def as_dict(self):
+        return {location: dict(table) for location, table in self._tables.items()}
+
+    def __len__(self):
+        return sum(len(table) for table in self._tables.values())
+
+
+def suggest_target(rule_set, query):
+    """(closest term, rule key it resolves to or None, other close terms) from the location's fuzzy engine."""
+    matches = rule_set.term_index.suggestion_index.close_matches(query, n=3, cutoff=0.6)
+    if not matches: return None, None, []
+    target = rule_set.aliases.get(matches[0], matches[0])
+    return matches[0], target if target in rule_set.rules else None, matches[1:]
+
+
+def alias_candidates(misses, resolve, learned, limit=20, min_count=2):
+    """Candidate aliases for the most frequent misses.
+
+    misses is MissCounter.top() over (location, query) keys; resolve(location)
+    returns that location's RuleSet. Each candidate names the fuzzy engine's
+    closest rule (aliases followed) with its similarity, or None when nothing
+    is close enough, for an admin to approve via LearnedAliases.
+    """
+    candidates = []
+    for (location, query), count, error in misses:
+        if count < min_count: break
+        table = learned.table(location)
+        if table and query in table: continue
+        try: rule_set = resolve(location)
+        except KeyError: continue # Location removed by a rules reload
+        suggestion, target, alternatives = suggest_target(rule_set, query)
+        candidates.append({"location": location, "query": query, "count": count, "min_count": count - error,
+                           "suggestion": suggestion, "target": target, "alternatives": alternatives,
+                           "similarity": round(difflib.SequenceMatcher(None, query, suggestion).ratio(), 3) if suggestion else None})
+        if len(candidates) >= limit: break
+    return candidates
@@ -0,0 +1,80 @@
+# bench_common.py - Shared helpers for the benchmark scripts
+#
+# Percentiles, multipart bodies, peak RSS and the JSON result format used by bench_micro.py,
+# bench_load.py and run_suite.py, so runs on different commits can be diffed.
+
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+try:
+    import resource # Unix only; peak RSS is reported as None elsewhere
+except ImportError:
+    resource = None
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(values, p):
+    if not values: return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def multipart(field, filename, data):
+    boundary = "benchboundary"
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: image/jpeg\r\n\r\n").encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def latency_summary(latencies_ms, elapsed_s=None):
+    """p50/p95/p99/max in milliseconds, plus throughput when the wall time is known."""
+    ordered = sorted(latencies_ms)
+    summary = {"count": len(ordered), "p50_ms": round(percentile(ordered, 50), 4), "p95_ms": round(percentile(ordered, 95), 4),
+               "p99_ms": round(percentile(ordered, 99), 4), "max_ms": round(ordered[-1], 4) if ordered else 0.0}
+    if elapsed_s: summary["throughput_per_s"] = round(len(ordered) / elapsed_s, 1)
+    return summary
+
+
+def timed_calls(fn, args):
+    """Call fn once per argument; returns per-call latencies in milliseconds and the total wall time."""
+    latencies = []
+    clock = time.perf_counter
+    start = clock()
+    for arg in args:
+        t = clock()
+        fn(arg)
+        latencies.append((clock() - t) * 1e3)
+    return latencies, clock() - start
+
+
+def peak_rss_mb():
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1) # bytes on macOS, KiB on Linux
+
+
+def git_commit():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): return None
+
+
+def run_metadata():
+    return {"timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"), "commit": git_commit(),
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def write_results(name, results, path=None):
+    """Write {"meta": ..., "results": ...} to path (default benchmarks/results/<name>-<timestamp>.json)."""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{name}-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": run_metadata(), "results": results}, f, indent=2)
+    return path
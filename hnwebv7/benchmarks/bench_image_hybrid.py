@@ -0,0 +1,68 @@
+# bench_image_hybrid.py - /analyze_image with the full prompt vs rule-first (location given: label call + rule lookup)
+#
+# Run from the hnwebv7 folder:  python benchmarks/bench_image_hybrid.py [--requests 40] [--json PATH]
+# The fake model sleeps FAKE_MODEL_DELAY per call plus FAKE_MODEL_TOKEN_DELAY per
+# output token, so shorter answers come back sooner as they do from the real model.
+# Three cases go through the Flask test client with the image cache off: no location
+# (full prompt), a location whose rules list the object (one label call) and one whose
+# rules do not (label call, then the full prompt). Prompt and answer sizes are
+# reported in characters next to the latencies.
+
+import argparse
+import io
+import os
+import sys
+
+os.environ.setdefault("VISION_MODEL", "fake")
+os.environ.setdefault("FAKE_MODEL_DELAY", "0.2")
+os.environ.setdefault("FAKE_MODEL_TOKEN_DELAY", "0.005")
+os.environ.setdefault("VISION_WARMUP", "eager")
+os.environ.setdefault("IMAGE_CACHE_SIZE", "0") # Every request pays for its model calls
+os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PIL.Image  # noqa: E402
+
+from bench_common import latency_summary, multipart, timed_calls, write_results  # noqa: E402
+
+from app import IMAGE_ANALYSIS_PROMPT, LABEL_ANALYSIS_PROMPT, VISION, app  # noqa: E402
+
+CASES = (("full_prompt", None), ("rule_hit", "fairfax_va"), ("rule_miss_fallback", "md")) # md lists no plastic bottle
+
+
+def run(requests=40):
+    buffer = io.BytesIO()
+    PIL.Image.effect_noise((640, 480), 40).convert("RGB").save(buffer, "JPEG")
+    body, content_type = multipart("image_file", "bench.jpg", buffer.getvalue())
+    client = app.test_client()
+    model = VISION.get()
+    results = {"prompt_chars": {"full": len(IMAGE_ANALYSIS_PROMPT.strip()), "label": len(LABEL_ANALYSIS_PROMPT.strip())},
+               "answer_chars": {"full": len(model.text), "label": len(model.label)}, "cases": {}}
+    for case, location in CASES:
+        path = "/analyze_image" + (f"?location={location}" if location else "")
+        sources = {}
+        def call(_):
+            source = client.post(path, data=body, content_type=content_type).get_json().get("source")
+            sources[source] = sources.get(source, 0) + 1
+        calls_before = model.calls
+        latencies, elapsed = timed_calls(call, range(requests))
+        results["cases"][case] = {**latency_summary(latencies, elapsed), "model_calls_per_request": (model.calls - calls_before) / requests, "sources": sources}
+    return results
+
+
+def print_report(results):
+    print(f"prompt chars: full {results['prompt_chars']['full']}, label {results['prompt_chars']['label']}; "
+          f"answer chars: full {results['answer_chars']['full']}, label {results['answer_chars']['label']}")
+    print(f"{'case':>20} {'p50 ms':>8} {'p99 ms':>8} {'calls/req':>10}")
+    for case, s in results["cases"].items():
+        print(f"{case:>20} {s['p50_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['model_calls_per_request']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/analyze_image full prompt vs rule-first label lookup, with the fake model")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per case")
+    parser.add_argument("--json", help="Result file (default: benchmarks/results/image_hybrid-<timestamp>.json)")
+    args = parser.parse_args()
+    results = run(args.requests)
+    print_report(results)
+    print(f"wrote {write_results('image_hybrid', results, args.json)}")
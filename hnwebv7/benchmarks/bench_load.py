@@ -0,0 +1,171 @@
+# bench_load.py - End-to-end load generator for /sort and /analyze_image with the fake model
+#
+# Run from the hnwebv7 folder:  python benchmarks/bench_load.py [--mode client|server] [--requests 2000]
+#                                   [--concurrency 8] [--image-ratio 0.1] [--json PATH]
+# client mode drives the Flask test client in-process (no sockets, measures the app
+# itself); server mode starts a local threaded server and uses real HTTP. The request
+# sequence is fixed by --seed, and the vision model is the sleeping stub from
+# fake_model.py, so runs are comparable. Per-endpoint p50/p95/p99, throughput and
+# peak RSS are written as JSON.
+
+import argparse
+import io
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+os.environ.setdefault("VISION_MODEL", "fake")
+os.environ.setdefault("FAKE_MODEL_DELAY", "0.05")
+os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PIL.Image  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from bench_common import latency_summary, multipart, peak_rss_mb, write_results  # noqa: E402
+from bench_suggest import HAND_TYPOS  # noqa: E402
+
+from app import IMAGE_RESULT_CACHE, MODEL_POOL, RULE_REGISTRY, SORT_RESPONSE_CACHE, app  # noqa: E402
+
+logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+DISTINCT_IMAGES = 16
+
+
+def make_images(count, rng):
+    images = []
+    for _ in range(count):
+        buffer = io.BytesIO()
+        base = PIL.Image.effect_noise((640, 480), 40).convert("RGB")
+        PIL.Image.blend(base, PIL.Image.new("RGB", base.size, tuple(rng.randrange(256) for _ in range(3))), 0.5).save(buffer, "JPEG")
+        images.append(buffer.getvalue())
+    return images
+
+
+def make_plan(count, image_ratio, rng):
+    """The fixed request sequence: ("sort", location, query) or ("image", image number)."""
+    registry = RULE_REGISTRY.current
+    locations = registry.locations()
+    terms = {location: list(registry.get(location).term_index.terms) for location in locations}
+    plan = []
+    for _ in range(count):
+        if rng.random() < image_ratio: plan.append(("image", rng.randrange(DISTINCT_IMAGES)))
+        else:
+            location = rng.choice(locations + ["unknown_county"])
+            roll = rng.random()
+            if roll < 0.6: query = rng.choice(terms.get(location, terms[locations[0]]))
+            elif roll < 0.8: query = f"an old {rng.choice(terms.get(location, terms[locations[0]]))} from the garage"
+            else: query = rng.choice(HAND_TYPOS)
+            plan.append(("sort", location, query))
+    return plan
+
+
+class ClientTransport:
+    """Flask test client, one per worker thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None: client = self._local.client = app.test_client()
+        return client
+
+    def sort(self, location, query):
+        return self._client().get("/sort", query_string={"location": location, "query": query}).status_code
+
+    def image(self, body, content_type):
+        return self._client().post("/analyze_image", data=body, content_type=content_type).status_code
+
+
+class ServerTransport:
+    """Real HTTP against a local threaded werkzeug server."""
+
+    def __init__(self):
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def _open(self, req):
+        try:
+            with urllib.request.urlopen(req) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e: return e.code
+
+    def sort(self, location, query):
+        return self._open(f"{self.base_url}/sort?{urllib.parse.urlencode({'location': location, 'query': query})}")
+
+    def image(self, body, content_type):
+        return self._open(urllib.request.Request(f"{self.base_url}/analyze_image", data=body, headers={"Content-Type": content_type}))
+
+    def close(self):
+        self.server.shutdown()
+
+
+def run(mode="client", requests=2000, concurrency=8, image_ratio=0.1, seed=42):
+    rng = random.Random(seed)
+    bodies = [multipart("image_file", f"bench{n}.jpg", data) for n, data in enumerate(make_images(DISTINCT_IMAGES, rng))]
+    plan = make_plan(requests, image_ratio, rng)
+    transport = ServerTransport() if mode == "server" else ClientTransport()
+    SORT_RESPONSE_CACHE.clear()
+    latencies = {"sort": [], "image": []}
+    statuses = {"sort": {}, "image": {}}
+    lock = threading.Lock()
+    position = iter(range(len(plan)))
+
+    def worker():
+        while True:
+            with lock: i = next(position, None)
+            if i is None: return
+            kind, *args = plan[i]
+            start = time.perf_counter()
+            status = transport.sort(*args) if kind == "sort" else transport.image(*bodies[args[0]])
+            elapsed_ms = (time.perf_counter() - start) * 1e3
+            with lock:
+                latencies[kind].append(elapsed_ms)
+                statuses[kind][status] = statuses[kind].get(status, 0) + 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - start
+    if mode == "server": transport.close()
+
+    endpoints = {}
+    for kind, path in (("sort", "/sort"), ("image", "/analyze_image")):
+        endpoints[path] = {**latency_summary(latencies[kind], elapsed), "status_counts": {str(k): v for k, v in sorted(statuses[kind].items())}}
+    return {"config": {"mode": mode, "requests": requests, "concurrency": concurrency, "image_ratio": image_ratio, "seed": seed,
+                       "fake_model_delay": float(os.environ["FAKE_MODEL_DELAY"])},
+            "elapsed_s": round(elapsed, 3), "throughput_per_s": round(len(plan) / elapsed, 1), "endpoints": endpoints,
+            "peak_rss_mb": peak_rss_mb(), "sort_cache": SORT_RESPONSE_CACHE.stats(), "image_cache": IMAGE_RESULT_CACHE.stats(),
+            "model_pool": MODEL_POOL.stats()}
+
+
+def print_report(results):
+    config = results["config"]
+    print(f"{config['mode']} mode, {config['requests']} requests, concurrency {config['concurrency']}: "
+          f"{results['throughput_per_s']} req/s overall in {results['elapsed_s']} s, peak RSS {results['peak_rss_mb']} MB")
+    for path, s in results["endpoints"].items():
+        print(f"  {path:<15} n={s['count']:<6} p50 {s['p50_ms']:.2f} ms  p95 {s['p95_ms']:.2f} ms  p99 {s['p99_ms']:.2f} ms  status {s['status_counts']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end /sort and /analyze_image load test with the fake model")
+    parser.add_argument("--mode", choices=("client", "server"), default="client")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--image-ratio", type=float, default=0.1, help="Fraction of requests that are image uploads")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Result file (default: benchmarks/results/load-<timestamp>.json)")
+    args = parser.parse_args()
+    results = run(args.mode, args.requests, args.concurrency, args.image_ratio, args.seed)
+    print_report(results)
+    print(f"wrote {write_results('load', results, args.json)}")
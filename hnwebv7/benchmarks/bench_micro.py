@@ -0,0 +1,95 @@
+# bench_micro.py - Term matching (single and multi-item), fuzzy suggestion, get_sorting_info and learned-alias hits at several rule-table sizes
+#
+# Run from the hnwebv7 folder:  python benchmarks/bench_micro.py [--sizes 100,1000,5000] [--json PATH]
+# Tables are grown synthetically from every county rule file. Each stage is timed
+# per call and reported as p50/p95/p99 plus throughput; results go to a JSON file
+# (benchmarks/results/ by default) so runs can be compared with run_suite.py.
+
+import argparse
+import os
+import random
+import sys
+
+os.environ.setdefault("VISION_MODEL", "fake") # get_sorting_info lives in app.py; never touch the real model
+os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_common import APP_DIR, latency_summary, peak_rss_mb, timed_calls, write_results  # noqa: E402
+from bench_suggest import typo_corpus  # noqa: E402
+from bench_term_index import grow_rules  # noqa: E402
+from rule_registry import RuleRegistry  # noqa: E402
+from term_index import TermIndex  # noqa: E402
+
+from app import get_sorting_info  # noqa: E402
+
+DEFAULT_SIZES = (100, 1000, 5000)
+QUERIES_PER_SIZE = 2000
+
+
+def county_tables():
+    """Union of every location's rules (first definition wins) and the shared aliases."""
+    registry = RuleRegistry(os.path.join(APP_DIR, "rules"))
+    rules, aliases = {}, {}
+    for location in registry.locations():
+        rule_set = registry.get(location)
+        for item, rule in rule_set.rules.items(): rules.setdefault(item, rule)
+        aliases.update(rule_set.aliases)
+    return rules, aliases
+
+
+def hit_queries(terms, count, rng):
+    return [f"a {rng.choice(terms)} from the kitchen" if i % 2 else rng.choice(terms) for i in range(count)]
+
+
+def bench_size(base_rules, aliases, size, rng):
+    rules = grow_rules(base_rules, size, rng)
+    build_latencies, _ = timed_calls(lambda _: TermIndex(rules, aliases), range(3))
+    index = TermIndex(rules, aliases)
+    terms = list(index.terms)
+    hits = hit_queries(terms, QUERIES_PER_SIZE, rng)
+    misses = [q for q in typo_corpus(terms, QUERIES_PER_SIZE, rng) if index.find(q) is None] # Only queries that reach the fuzzy fallback
+    mixed = hits[:QUERIES_PER_SIZE // 2] + misses[:QUERIES_PER_SIZE // 2]
+    rng.shuffle(mixed)
+
+    stages = {}
+    latencies, elapsed = timed_calls(index.find, hits)
+    stages["term_match"] = latency_summary(latencies, elapsed)
+    latencies, elapsed = timed_calls(index.token_index.find_all, hits)
+    stages["multi_item_match"] = latency_summary(latencies, elapsed)
+    latencies, elapsed = timed_calls(lambda q: index.suggestion_index.close_matches(q, n=3, cutoff=0.6), misses)
+    stages["fuzzy_suggestion"] = latency_summary(latencies, elapsed)
+    latencies, elapsed = timed_calls(lambda q: get_sorting_info(q, "Bench County", rules, aliases, "Bench County", index), mixed)
+    stages["get_sorting_info"] = latency_summary(latencies, elapsed)
+    # The same misses before and after each one is approved as a learned alias (alias_learning.py)
+    latencies, elapsed = timed_calls(lambda q: get_sorting_info(q, "Bench County", rules, aliases, "Bench County", index), misses)
+    stages["sort_miss"] = latency_summary(latencies, elapsed)
+    rule_keys = list(rules)
+    learned = {q: rng.choice(rule_keys) for q in misses}
+    latencies, elapsed = timed_calls(lambda q: get_sorting_info(q, "Bench County", rules, aliases, "Bench County", index, learned), list(learned))
+    stages["learned_alias"] = latency_summary(latencies, elapsed)
+    return {"rules": len(rules), "terms": len(terms), "index_build_ms": round(min(build_latencies), 2), "stages": stages}
+
+
+def run(sizes, seed=42):
+    rng = random.Random(seed)
+    base_rules, aliases = county_tables()
+    return {"seed": seed, "sizes": [bench_size(base_rules, aliases, size, rng) for size in sizes], "peak_rss_mb": peak_rss_mb()}
+
+
+def print_report(results):
+    print(f"{'terms':>7} {'stage':>17} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'ops/s':>10}")
+    for entry in results["sizes"]:
+        for stage, s in entry["stages"].items():
+            print(f"{entry['terms']:>7} {stage:>17} {s['p50_ms'] * 1e3:>9.1f} {s['p95_ms'] * 1e3:>9.1f} {s['p99_ms'] * 1e3:>9.1f} {s['throughput_per_s']:>10.0f}")
+    print(f"peak RSS: {results['peak_rss_mb']} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Term matching and fuzzy suggestion micro-benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated rule-table sizes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Result file (default: benchmarks/results/micro-<timestamp>.json)")
+    args = parser.parse_args()
+    results = run([int(s) for s in args.sizes.split(",")], args.seed)
+    print_report(results)
+    print(f"wrote {write_results('micro', results, args.json)}")
@@ -0,0 +1,82 @@
+# bench_mixed_load.py - /sort latency and /analyze_image throughput under mixed load
+#
+# Run from the hnwebv7 folder:  python benchmarks/bench_mixed_load.py [seconds]
+# Starts the app on a local threaded server with the sleeping fake model
+# (VISION_MODEL=fake), then runs image uploaders and /sort clients side by
+# side. /sort latency should stay flat while image calls are saturated and
+# excess uploads are shed with 429s.
+
+import io
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+os.environ.setdefault("VISION_MODEL", "fake")
+os.environ.setdefault("FAKE_MODEL_DELAY", "0.5")
+os.environ.setdefault("IMAGE_CACHE_SIZE", "0") # Every upload must reach the model
+os.environ.setdefault("SORT_CACHE_SIZE", "0") # Measure the lookup path, not cache hits
+os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PIL.Image  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from bench_common import multipart, percentile  # noqa: E402
+
+from app import MODEL_POOL, app  # noqa: E402
+
+IMAGE_CLIENTS = 16
+SORT_CLIENTS = 4
+SORT_QUERIES = ("plastic bottle", "pizza box", "battery", "bottel", "glass jar with lid", "xyzzy")
+
+
+def make_jpeg():
+    buffer = io.BytesIO()
+    PIL.Image.effect_noise((640, 480), 40).convert("RGB").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def run(base_url, seconds):
+    stop = time.monotonic() + seconds
+    sort_latencies, image_status = [], {}
+    lock = threading.Lock()
+    body, content_type = multipart("image_file", "bench.jpg", make_jpeg())
+
+    def image_client():
+        while time.monotonic() < stop:
+            req = urllib.request.Request(f"{base_url}/analyze_image", data=body, headers={"Content-Type": content_type})
+            try: status = urllib.request.urlopen(req).status
+            except urllib.error.HTTPError as e: status = e.code
+            with lock: image_status[status] = image_status.get(status, 0) + 1
+            if status == 429: time.sleep(0.05)
+
+    def sort_client(i):
+        n = i
+        while time.monotonic() < stop:
+            query = urllib.request.quote(SORT_QUERIES[n % len(SORT_QUERIES)])
+            start = time.perf_counter()
+            urllib.request.urlopen(f"{base_url}/sort?location=fairfax_va&query={query}").read()
+            with lock: sort_latencies.append((time.perf_counter() - start) * 1e3)
+            n += 1
+
+    threads = [threading.Thread(target=image_client) for _ in range(IMAGE_CLIENTS)]
+    threads += [threading.Thread(target=sort_client, args=(i,)) for i in range(SORT_CLIENTS)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return sort_latencies, image_status
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    sort_latencies, image_status = run(base_url, seconds)
+    server.shutdown()
+    print(f"model pool: {MODEL_POOL.stats()}")
+    print(f"/analyze_image: {image_status.get(200, 0) / seconds:.1f} ok/s, status counts {image_status}")
+    print(f"/sort: {len(sort_latencies) / seconds:.0f} req/s, p50 {percentile(sort_latencies, 50):.1f} ms, "
+          f"p95 {percentile(sort_latencies, 95):.1f} ms, p99 {percentile(sort_latencies, 99):.1f} ms")
@@ -0,0 +1,138 @@
+# bench_parse.py - Correctness and throughput of the strict model-answer parser on a corpus of real and malformed answers
+#
+# Run from the hnwebv7 folder:  python benchmarks/bench_parse.py [--repeat 2000] [--json PATH]
+# Every corpus entry names the classification model_output.parse_result must return,
+# or "Error" when the answer must be rejected. Any disagreement is listed and makes
+# the script exit non-zero. Throughput is compared with the old line-splitting
+# parse_result_to_dict, kept here verbatim and timed on the same valid answers in
+# its own "Object: / Classification: / Reason:" format. Its column in the report
+# shows how it read the corpus: failures and broken answers came back as
+# error-free "Unknown" results.
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_common import latency_summary, timed_calls, write_results  # noqa: E402
+from model_output import parse_result  # noqa: E402
+
+
+def answer(obj="Plastic Bottle", classification="Recycling", reason="Rigid #1 PET bottles are widely accepted curbside.", confidence=0.92, **extra):
+    return json.dumps({"object": obj, "classification": classification, "reason": reason, "confidence": confidence, **extra})
+
+
+# (name, raw answer, expected classification)
+CORPUS = [
+    ("json_mode", answer(), "Recycling"),
+    ("json_trash", answer("Chip Bag", "Trash", "Multi-layer film is not recyclable curbside.", 0.81), "Trash"),
+    ("json_uncertain", answer("Plastic Clamshell", "Uncertain/Check Locally", "#6 plastics vary by location.", 0.55), "Uncertain/Check Locally"),
+    ("json_pretty", json.dumps(json.loads(answer()), indent=2), "Recycling"),
+    ("json_case_spacing", answer(classification="uncertain / check locally"), "Uncertain/Check Locally"),
+    ("json_lowercase", answer(classification="trash"), "Trash"),
+    ("json_unicode", answer("Café cup", "Trash", "Plastic-lined paper cup — not accepted.", 0.7), "Trash"),
+    ("json_no_confidence", json.dumps({"object": "Glass Jar", "classification": "Recycling", "reason": "Rinse first."}), "Recycling"),
+    ("json_integer_confidence", answer(confidence=1), "Recycling"),
+    ("json_extra_field", answer(material="PET"), "Recycling"),
+    ("fenced_json", "```json\n" + answer() + "\n```", "Recycling"),
+    ("fenced_plain", "```\n" + answer(classification="Trash") + "\n```", "Trash"),
+    ("legacy_lines", "Object: Plastic Bottle\nClassification: Recycling\nReason: Rigid #1 PET bottles are widely accepted.", "Error"),
+    ("legacy_markdown", "**Object:** Pizza Box\n**Classification:** Trash\n**Reason:** Greasy.", "Error"),
+    ("prose", "This looks like a plastic bottle, which is usually recyclable.", "Error"),
+    ("truncated", answer()[:40], "Error"),
+    ("empty", "", "Error"),
+    ("whitespace", "   \n ", "Error"),
+    ("json_array", "[" + answer() + "]", "Error"),
+    ("json_string", json.dumps("Recycling"), "Error"),
+    ("json_null", "null", "Error"),
+    ("bad_enum", answer(classification="Compost"), "Error"),
+    ("bad_enum_recyclable", answer(classification="Recyclable"), "Error"),
+    ("missing_classification", json.dumps({"object": "Can", "reason": "Metal.", "confidence": 0.9}), "Error"),
+    ("missing_object", json.dumps({"classification": "Recycling", "reason": "Metal.", "confidence": 0.9}), "Error"),
+    ("blank_object", answer(obj="  "), "Error"),
+    ("object_not_string", answer(obj=42), "Error"),
+    ("reason_not_string", answer(reason=["a", "b"]), "Error"),
+    ("confidence_too_high", answer(confidence=92), "Error"),
+    ("confidence_negative", answer(confidence=-0.1), "Error"),
+    ("confidence_string", answer(confidence="high"), "Error"),
+    ("confidence_bool", answer(confidence=True), "Error"),
+    ("error_call", "Error during AI analysis: 503 The model is overloaded.", "Error"),
+    ("error_init", "Error: AI Vision Model not initialized.", "Error"),
+    ("blocked", "Analysis Blocked by API. Reason: SAFETY", "Error"),
+    ("failed_empty", "Analysis Failed: Received empty or blocked response from AI.", "Error"),
+    ("batch_missing", "Analysis Failed: No result for this image in the batch response.", "Error"),
+]
+
+
+def legacy_parse_result_to_dict(analysis_result_raw):
+    # The line-splitting parser this replaced (app.py before the structured-output change), for comparison only
+    result = {"object": "Unknown", "classification": "Unknown", "reason": "N/A", "error": None }
+    if not analysis_result_raw or not isinstance(analysis_result_raw, str): result["error"] = "Invalid analysis result."; return result
+    if analysis_result_raw.lower().startswith(("error:", "analysis failed:", "analysis blocked:")): result["error"] = analysis_result_raw; result["classification"] = "Error"; return result
+    try:
+        lines = analysis_result_raw.strip().split('\n')
+        for line in lines:
+            if ":" in line:
+                key, value = line.split(":", 1); key_lower = key.lower().strip(); value_strip = value.strip()
+                if key_lower == "object": result["object"] = value_strip
+                elif key_lower == "classification": result["classification"] = value_strip
+                elif key_lower == "reason": result["reason"] = value_strip
+    except Exception: result["error"] = "Failed to parse AI response."; result["reason"] = analysis_result_raw; result["classification"] = "Error"
+    return result
+
+
+def as_lines(raw):
+    # The same answer in the pre-JSON prompt format, for timing the legacy parser on input it understands
+    data = json.loads(raw.strip().strip("`").removeprefix("json"))
+    return f"Object: {data['object']}\nClassification: {data['classification']}\nReason: {data['reason']}"
+
+
+def check(corpus):
+    """[(name, expected, got, legacy reading)] for every entry, plus the list of wrong strict results."""
+    rows, wrong = [], []
+    for name, raw, expected in corpus:
+        result = parse_result(raw)
+        if (result["classification"] == "Error") != (result["error"] is not None): wrong.append((name, expected, result)) # Error results always carry a message
+        elif result["classification"] != expected: wrong.append((name, expected, result))
+        legacy = legacy_parse_result_to_dict(raw)
+        rows.append((name, expected, result["classification"], "Error" if legacy["error"] else legacy["classification"]))
+    return rows, wrong
+
+
+def run(repeat=2000):
+    rows, wrong = check(CORPUS)
+    workload = [raw for _ in range(repeat) for _, raw, _ in CORPUS]
+    valid = [raw for _ in range(repeat) for _, raw, expected in CORPUS if expected != "Error"]
+    valid_lines = [as_lines(raw) for raw in valid]
+    stages = {}
+    for stage, fn, inputs in (("strict_valid", parse_result, valid), ("legacy_valid", legacy_parse_result_to_dict, valid_lines),
+                              ("strict_all", parse_result, workload)):
+        latencies, elapsed = timed_calls(fn, inputs)
+        stages[stage] = latency_summary(latencies, elapsed)
+    legacy_misread = [name for name, expected, _, legacy in rows if expected == "Error" and legacy == "Unknown"]
+    return {"corpus": len(CORPUS), "wrong": [{"name": n, "expected": e, "got": r} for n, e, r in wrong],
+            "legacy_misread": legacy_misread, "cases": [dict(zip(("name", "expected", "strict", "legacy"), row)) for row in rows], "stages": stages}
+
+
+def print_report(results):
+    print(f"{'case':>24} {'expected':>24} {'strict':>24} {'legacy':>24}")
+    for case in results["cases"]:
+        print(f"{case['name']:>24} {case['expected']:>24} {case['strict']:>24} {str(case['legacy'])[:24]:>24}")
+    print(f"strict parser: {results['corpus'] - len(results['wrong'])}/{results['corpus']} correct; "
+          f"legacy parser returned {len(results['legacy_misread'])} unusable answers as error-free Unknown results")
+    for stage, s in results["stages"].items():
+        print(f"{stage:>13}: p50 {s['p50_ms'] * 1e3:.2f} us  p99 {s['p99_ms'] * 1e3:.2f} us  {s['throughput_per_s']:.0f}/s")
+    for w in results["wrong"]: print(f"WRONG {w['name']}: expected {w['expected']}, got {w['got']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Strict model-answer parser: corpus correctness and throughput")
+    parser.add_argument("--repeat", type=int, default=2000, help="Passes over the corpus for the timing stages")
+    parser.add_argument("--json", help="Result file (default: benchmarks/results/parse-<timestamp>.json)")
+    args = parser.parse_args()
+    results = run(args.repeat)
+    print_report(results)
+    print(f"wrote {write_results('parse', results, args.json)}")
+    if results["wrong"]: sys.exit(1)
@@ -0,0 +1,139 @@
+# bench_rule_memory.py - Memory of dict-of-dicts rule tables vs the shared compact store, at many jurisdictions
+#
+# Run from the hnwebv7 folder:  python benchmarks/bench_rule_memory.py [--jurisdictions 8,100,500] [--json PATH]
+# Jurisdictions are synthesized from the real rule tables: each one takes a location's
+# flattened rules (parent layers applied, as the app serves them), drops and adds a few items from the other counties and rewrites ~10% of the
+# notes so that not everything deduplicates. Every layout is built in a fresh
+# process from the JSON text (as the registry does from files) and reported as the
+# RSS and tracemalloc growth. The hit path (lookup plus the old .copy()/.update()
+# vs rule_response) is timed in this process.
+
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+os.environ.setdefault("VISION_MODEL", "fake")
+os.environ.setdefault("VISION_WARMUP", "lazy")
+os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_common import APP_DIR, latency_summary, timed_calls, write_results  # noqa: E402
+
+LAYOUTS = ("dict", "compact")
+DEFAULT_JURISDICTIONS = (8, 100, 500)
+
+
+def synthesize(count, seed=42):
+    """JSON texts of `count` standalone rule tables derived from the real flattened ones."""
+    from rule_registry import RuleRegistry
+    rng = random.Random(seed)
+    registry = RuleRegistry(os.path.join(APP_DIR, "rules"))
+    bases = [{item: dict(rule) for item, rule in registry.get(location).rules.items()} for location in registry.locations()]
+    pool = [(item, rule) for base in bases for item, rule in base.items()]
+    texts = []
+    for i in range(count):
+        rules = dict(bases[i % len(bases)])
+        for item in rng.sample(list(rules), k=min(3, len(rules))): del rules[item]
+        for item, rule in rng.sample(pool, k=5): rules.setdefault(item, rule)
+        for item in rng.sample(list(rules), k=len(rules) // 10):
+            rules[item] = {"category": rules[item]["category"], "notes": f"{rules[item]['notes']} Call jurisdiction {i} for pickup."}
+        texts.append(json.dumps({"rules_source": f"Jurisdiction {i}", "rules": rules}))
+    return texts
+
+
+def current_rss_kb():
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError): return None # Not Linux: only tracemalloc figures are reported
+
+
+def build(layout, texts):
+    from rule_store import RuleVocabulary
+    vocabulary = RuleVocabulary()
+    if layout == "dict": return [json.loads(text)["rules"] for text in texts]
+    return [vocabulary.compact(json.loads(text)["rules"]) for text in texts]
+
+
+def child(layout, path, traced):
+    """Runs in a fresh interpreter: prints the growth caused by building every table in `layout`."""
+    with open(path, encoding="utf-8") as f: texts = json.load(f)
+    import rule_store  # noqa: F401 - imported before the baseline so module code is not counted
+    gc.collect()
+    if traced: tracemalloc.start()
+    before = current_rss_kb()
+    tables = build(layout, texts)
+    gc.collect()
+    result = {"tables": len(tables)}
+    if traced: result["traced_kb"] = round(tracemalloc.get_traced_memory()[0] / 1024, 1)
+    else: result["rss_kb"] = current_rss_kb() - before if before is not None else None
+    print(json.dumps(result))
+
+
+def measure(layout, path, traced):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", layout, path] + (["--traced"] if traced else []),
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def bench_hits(texts, rng):
+    """Per-hit lookup + response assembly: dict table with copy+update vs CompactRules with rule_response."""
+    from app import rule_response
+    from rule_store import RuleVocabulary
+    raw = json.loads(texts[0])["rules"]
+    compact = RuleVocabulary().compact(raw)
+    keys = [rng.choice(list(raw)) for _ in range(20000)]
+    def legacy(key):
+        if key not in raw: return None
+        result = raw[key].copy()
+        result.update({"query": key, "location": "L", "keyword_identified": key, "alias_resolution": None, "status": "found", "rules_source": "S"})
+        return result
+    stages = {}
+    latencies, elapsed = timed_calls(legacy, keys)
+    stages["copy_update"] = latency_summary(latencies, elapsed)
+    latencies, elapsed = timed_calls(lambda key: rule_response(compact[key], key, "L", key, None, "S") if key in compact else None, keys)
+    stages["rule_response"] = latency_summary(latencies, elapsed)
+    return stages
+
+
+def run(counts, seed=42):
+    results = {"seed": seed, "jurisdictions": []}
+    for count in counts:
+        texts = synthesize(count, seed)
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f: json.dump(texts, f)
+        try:
+            entry = {"jurisdictions": count, "rules": sum(len(json.loads(t)["rules"]) for t in texts), "layouts": {}}
+            for layout in LAYOUTS:
+                entry["layouts"][layout] = {**measure(layout, f.name, False), **measure(layout, f.name, True)}
+        finally: os.unlink(f.name)
+        results["jurisdictions"].append(entry)
+    results["hit_response"] = bench_hits(synthesize(1, seed), random.Random(seed))
+    return results
+
+
+def print_report(results):
+    print(f"{'jurisdictions':>13} {'rules':>7} {'layout':>8} {'RSS KB':>9} {'traced KB':>10}")
+    for entry in results["jurisdictions"]:
+        for layout, m in entry["layouts"].items():
+            print(f"{entry['jurisdictions']:>13} {entry['rules']:>7} {layout:>8} {m['rss_kb'] if m['rss_kb'] is not None else '-':>9} {m['traced_kb']:>10}")
+    for stage, s in results["hit_response"].items():
+        print(f"hit response {stage:>14}: p50 {s['p50_ms'] * 1e3:.2f} us  p99 {s['p99_ms'] * 1e3:.2f} us  {s['throughput_per_s']:.0f}/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rule table memory: dict-of-dicts vs compact shared store")
+    parser.add_argument("--jurisdictions", default=",".join(map(str, DEFAULT_JURISDICTIONS)), help="Comma-separated jurisdiction counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Result file (default: benchmarks/results/rule_memory-<timestamp>.json)")
+    parser.add_argument("--child", nargs=2, metavar=("LAYOUT", "PATH"), help=argparse.SUPPRESS)
+    parser.add_argument("--traced", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child: child(*args.child, args.traced); sys.exit()
+    results = run([int(c) for c in args.jurisdictions.split(",")], args.seed)
+    print_report(results)
+    print(f"wrote {write_results('rule_memory', results, args.json)}")
@@ -0,0 +1,73 @@
+# bench_sort_batch.py - N single GET /sort requests vs. one POST /sort/batch
+#
+# Run from the hnwebv7 folder:  python benchmarks/bench_sort_batch.py [items]
+# Serves the app on a local threaded server (real HTTP, one keep-alive-less
+# connection per request as a plain client would do) and classifies the same
+# manifest three ways: one request per item, one batch, one NDJSON stream.
+
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+os.environ.setdefault("VISION_MODEL", "fake")
+os.environ.setdefault("SORT_CACHE_SIZE", "0") # Compare lookup paths, not cache hits
+os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server  # noqa: E402
+
+from app import RULE_REGISTRY, app  # noqa: E402
+
+logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+
+def manifest(count):
+    rng = random.Random(3)
+    keys = list(RULE_REGISTRY.current.get("fairfax_va").rules) + ["bottel", "xyzzy", "empty glass jar"]
+    return [rng.choice(keys) for _ in range(count)]
+
+
+def singles(base_url, queries):
+    results = []
+    for q in queries:
+        url = f"{base_url}/sort?location=fairfax_va&query={urllib.parse.quote(q)}"
+        results.append(json.loads(urllib.request.urlopen(url).read()))
+    return results
+
+
+def batch(base_url, queries, stream=False):
+    body = json.dumps({"location": "fairfax_va", "queries": queries}).encode()
+    req = urllib.request.Request(f"{base_url}/sort/batch{'?stream=1' if stream else ''}", data=body,
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req) as response:
+        if stream: return [json.loads(line) for line in response]
+        return json.loads(response.read())["results"]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    queries = manifest(count)
+
+    single_results, single_s = timed(singles, base_url, queries)
+    batch_results, batch_s = timed(batch, base_url, queries)
+    stream_results, stream_s = timed(batch, base_url, queries, stream=True)
+    server.shutdown()
+    assert single_results == batch_results == stream_results
+
+    for name, seconds in (("single GET /sort", single_s), ("POST /sort/batch", batch_s), ("NDJSON stream", stream_s)):
+        print(f"{name:>18}: {seconds * 1e3:8.1f} ms total, {count / seconds:9.0f} items/s, {single_s / seconds:5.1f}x")
@@ -0,0 +1,101 @@
+# bench_startup.py - Cold start: time from process launch to the first /sort answer and to vision readiness
+#
+# Run from the hnwebv7 folder:  python benchmarks/bench_startup.py [--runs 3] [--json PATH]
+# Launches the server with app.run once per VISION_WARMUP mode and polls it over HTTP.
+# 'eager' is the old behaviour: the vision stack is imported before Flask serves.
+# --model gemini (the default when google-generativeai is installed; building the
+# model makes no API call) measures the real SDK import. Without the SDK the fake
+# backend is used, which still times the server start and the warm-up machinery.
+
+import argparse
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from bench_common import APP_DIR, latency_summary, write_results
+
+MODES = ("eager", "background", "lazy")
+SERVER_CODE = ("import logging, sys; sys.path.insert(0, {app_dir!r}); logging.getLogger('werkzeug').setLevel(logging.ERROR)\n"
+               "from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def gemini_sdk_installed():
+    try: return importlib.util.find_spec("google.generativeai") is not None
+    except ImportError: return False # No "google" package at all
+
+
+def poll(url, deadline, accept=(200,), process=None):
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None: raise RuntimeError(f"server exited with code {process.returncode} before {url} answered")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status in accept: return response.read()
+        except (urllib.error.URLError, ConnectionError, OSError): pass
+        time.sleep(0.005)
+    raise TimeoutError(url)
+
+
+def wait_for_vision(base, deadline, process):
+    """Poll /ready until the vision model is ready; fail at once if it could not be built."""
+    while True:
+        status = json.loads(poll(f"{base}/ready", deadline, process=process))["vision"]
+        if status["ready"]: return
+        if status["state"] == "failed": raise RuntimeError(f"vision model failed to load: {status['error']}")
+        if time.monotonic() >= deadline: raise TimeoutError(f"{base}/ready?require=vision")
+        time.sleep(0.005)
+
+
+def cold_start(mode, model="gemini", timeout=60.0):
+    """Seconds from spawn to first /sort 200 and to a ready vision model, for one VISION_WARMUP mode."""
+    port = free_port()
+    env = {**os.environ, "VISION_MODEL": model, "FAKE_MODEL_DELAY": "0", "VISION_WARMUP": mode, "LOG_SAMPLE_RATE": "0", "PYTHONWARNINGS": "ignore"}
+    start = time.monotonic()
+    process = subprocess.Popen([sys.executable, "-c", SERVER_CODE.format(app_dir=APP_DIR, port=port)], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        poll(f"{base}/sort?location=fairfax_va&query=pizza%20box", start + timeout, process=process)
+        first_sort = time.monotonic() - start
+        ready = json.loads(poll(f"{base}/ready", start + timeout, process=process))
+        if mode == "lazy" and not ready["vision"]["ready"]:
+            # Nothing loads the model until an image arrives; time a first image request instead
+            try: urllib.request.urlopen(urllib.request.Request(f"{base}/analyze_image", data=b"", method="POST"), timeout=timeout)
+            except urllib.error.HTTPError: pass # 400 (no file) is expected; the model was built on the way
+        wait_for_vision(base, start + timeout, process)
+        vision_ready = time.monotonic() - start
+    finally:
+        process.terminate()
+        process.wait()
+    return first_sort * 1e3, vision_ready * 1e3
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time-to-first-/sort and time-to-vision-ready per VISION_WARMUP mode")
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts per mode")
+    parser.add_argument("--model", choices=("auto", "gemini", "fake"), default="auto",
+                        help="Vision backend; auto = gemini when google-generativeai is installed, else fake")
+    parser.add_argument("--json", help="Result file (default: benchmarks/results/startup-<timestamp>.json)")
+    args = parser.parse_args()
+    model = args.model
+    if model == "auto": model = "gemini" if gemini_sdk_installed() else "fake"
+    elif model == "gemini" and not gemini_sdk_installed(): parser.error("--model gemini needs google-generativeai (pip install google-generativeai)")
+    if model == "fake": print("google-generativeai is not in use; timing startup with the fake vision backend (no SDK import cost).")
+    results = {"model": model}
+    print(f"{'mode':>11} {'first /sort ms (p50)':>21} {'vision ready ms (p50)':>22}")
+    for mode in MODES:
+        samples = [cold_start(mode, model) for _ in range(args.runs)]
+        results[mode] = {"first_sort": latency_summary([s[0] for s in samples]), "vision_ready": latency_summary([s[1] for s in samples])}
+        print(f"{mode:>11} {results[mode]['first_sort']['p50_ms']:>21.0f} {results[mode]['vision_ready']['p50_ms']:>22.0f}")
+    print(f"wrote {write_results('startup', results, args.json)}")
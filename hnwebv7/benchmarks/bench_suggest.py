@@ -0,0 +1,87 @@
+# bench_suggest.py - difflib.get_close_matches vs. SuggestionIndex on the /sort miss path
+#
+# Run from the hnwebv7 folder:  python benchmarks/bench_suggest.py
+# Builds a typo corpus from the real rule tables, asserts that SuggestionIndex
+# returns exactly what difflib returns (including the /sort status decision),
+# then times both on synthetically grown tables.
+
+import difflib
+import os
+import random
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from rule_registry import RuleRegistry  # noqa: E402
+from suggest import SuggestionIndex  # noqa: E402
+
+REGISTRY = RuleRegistry(os.path.join(APP_DIR, "rules"))
+
+SIZES = (130, 1000, 5000)
+HAND_TYPOS = ("bottel", "plastik bottle", "cardbord", "alumnum can", "batery", "baterys", "newpaper", "magzine",
+              "stryofoam", "pizzza box", "coffe cup", "glas jar", "eggshels", "lightbulb", "cloths", "electroncs",
+              "diapr", "tin cann", "banan peel", "aple core", "carboard box", "paint can", "yoghurt tub", "xyzzy")
+
+
+def make_typo(term, rng):
+    i = rng.randrange(len(term))
+    op = rng.randrange(4)
+    if op == 0: return term[:i] + term[i + 1:]
+    if op == 1: return term[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + term[i:]
+    if op == 2: return term[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + term[i + 1:]
+    return term[:i] + term[i + 1:i + 2] + term[i:i + 1] + term[i + 2:]
+
+
+def typo_corpus(terms, count, rng):
+    return list(HAND_TYPOS) + [make_typo(rng.choice(terms), rng) for _ in range(count)]
+
+
+def status_for(query, suggestions):
+    """The suggestion branch of get_sorting_info."""
+    if not suggestions: return "not_found"
+    if len(suggestions) == 1 and difflib.SequenceMatcher(None, query, suggestions[0]).ratio() > 0.7: return "suggestion_found"
+    return "multiple_suggestions_found"
+
+
+def check_parity(terms, queries):
+    index = SuggestionIndex(terms)
+    for q in queries:
+        expected = difflib.get_close_matches(q, terms, n=3, cutoff=0.6)
+        got = index.close_matches(q, n=3, cutoff=0.6)
+        assert got == expected, (q, got, expected)
+        assert status_for(q, got) == status_for(q, expected), q
+
+
+def grow_terms(base, size, rng):
+    terms = set(base)
+    words = sorted({w for t in base for w in t.split()})
+    while len(terms) < size:
+        terms.add(" ".join(rng.choice(words) for _ in range(rng.randint(1, 3))))
+    return tuple(sorted(terms, key=len, reverse=True))
+
+
+def time_per_call(fn, queries):
+    start = time.perf_counter()
+    for q in queries: fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+if __name__ == "__main__":
+    rng = random.Random(7)
+    for location in REGISTRY.locations():
+        terms = REGISTRY.get(location).term_index.terms
+        check_parity(terms, typo_corpus(terms, 1500, rng))
+    print("parity: ok")
+
+    print(f"{'terms':>7} {'difflib us/query':>17} {'index us/query':>15} {'speedup':>8}")
+    base = REGISTRY.get("fairfax_va").term_index.terms
+    for size in SIZES:
+        terms = grow_terms(base, size, rng)
+        queries = typo_corpus(terms, 300, rng)
+        check_parity(terms, queries)
+        index = SuggestionIndex(terms)
+        difflib_us = time_per_call(lambda q: difflib.get_close_matches(q, terms, n=3, cutoff=0.6), queries)
+        index_us = time_per_call(index.close_matches, queries)
+        print(f"{len(terms):>7} {difflib_us:>17.1f} {index_us:>15.1f} {difflib_us / index_us:>7.1f}x")
@@ -0,0 +1,73 @@
+# bench_term_index.py - Legacy per-request term scan vs. precompiled TermIndex
+#
+# Run from the hnwebv7 folder:  python benchmarks/bench_term_index.py
+# Rule tables are synthetically grown from the Fairfax rule file so the effect of
+# table size on /sort latency is visible. Every query is checked for parity.
+
+import os
+import random
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from rule_registry import RuleRegistry  # noqa: E402
+from term_index import TermIndex  # noqa: E402
+
+FAIRFAX = RuleRegistry(os.path.join(APP_DIR, "rules")).get("fairfax_va")
+FAIRFAX_COUNTY_RULES, ALIASES = FAIRFAX.rules, FAIRFAX.aliases
+
+SIZES = (100, 1000, 5000)
+QUERIES_PER_SIZE = 2000
+MODIFIERS = ("small", "large", "empty", "dirty", "old", "broken", "clear", "green", "used", "plastic",
+             "metal", "paper", "glass", "foam", "kids", "office", "kitchen", "outdoor", "travel", "mini")
+
+
+def legacy_find(query, rules, aliases):
+    """The matching loop get_sorting_info ran on every request before TermIndex."""
+    terms = sorted(list(set(list(rules.keys()) + list(aliases.keys()))), key=len, reverse=True)
+    for term in terms:
+        if term in query:
+            return term
+    return None
+
+
+def grow_rules(base, size, rng):
+    rules = dict(base)
+    keys = list(base)
+    while len(rules) < size:
+        rules[f"{rng.choice(MODIFIERS)} {rng.choice(MODIFIERS)} {rng.choice(keys)} {len(rules)}"] = rng.choice(list(base.values()))
+    return rules
+
+
+def make_queries(rules, count, rng):
+    keys = list(rules) + list(ALIASES)
+    queries = []
+    for i in range(count):
+        if i % 3 == 0: queries.append(f"a {rng.choice(keys)} from the kitchen")
+        elif i % 3 == 1: queries.append(rng.choice(keys))
+        else: queries.append("".join(rng.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(rng.randint(5, 25))))
+    return queries
+
+
+def time_per_call(fn, queries):
+    start = time.perf_counter()
+    for q in queries: fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+if __name__ == "__main__":
+    rng = random.Random(42)
+    print(f"{'terms':>7} {'legacy us/query':>16} {'index us/query':>15} {'build ms':>9} {'speedup':>8}")
+    for size in SIZES:
+        rules = grow_rules(FAIRFAX_COUNTY_RULES, size, rng)
+        queries = make_queries(rules, QUERIES_PER_SIZE, rng)
+        build_start = time.perf_counter()
+        index = TermIndex(rules, ALIASES)
+        build_ms = (time.perf_counter() - build_start) * 1e3
+        for q in queries:
+            assert index.find(q) == legacy_find(q, rules, ALIASES), q
+        legacy_us = time_per_call(lambda q: legacy_find(q, rules, ALIASES), queries)
+        index_us = time_per_call(index.find, queries)
+        print(f"{len(index):>7} {legacy_us:>16.1f} {index_us:>15.1f} {build_ms:>9.1f} {legacy_us / index_us:>7.1f}x")
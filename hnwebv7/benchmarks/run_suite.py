@@ -0,0 +1,79 @@
+# run_suite.py - Micro-benchmarks plus end-to-end load test in one JSON result, with optional comparison
+#
+# Run from the hnwebv7 folder:  python benchmarks/run_suite.py [--quick] [--json PATH] [--compare OLD.json]
+# Writes {"meta": {commit, python, ...}, "results": {"micro": ..., "load": {"client": ..., "server": ...}}}.
+# --compare prints the change of every p50/p95/p99 and throughput figure against an
+# earlier run; --fail-over PCT exits non-zero when any latency got that much worse,
+# so the suite can gate CI or a pre-release check.
+
+import argparse
+import json
+import os
+import sys
+
+os.environ.setdefault("VISION_MODEL", "fake")
+os.environ.setdefault("FAKE_MODEL_DELAY", "0.05")
+os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+
+import bench_load  # noqa: E402
+import bench_micro  # noqa: E402
+from bench_common import peak_rss_mb, write_results  # noqa: E402
+
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def flatten(results):
+    """{"micro/5032/term_match/p95_ms": value, ...} for every latency and throughput figure."""
+    flat = {}
+    for entry in results.get("micro", {}).get("sizes", []):
+        for stage, summary in entry["stages"].items():
+            for key in LATENCY_KEYS + ("throughput_per_s",): flat[f"micro/{entry['terms']}/{stage}/{key}"] = summary[key]
+    for mode, load in results.get("load", {}).items():
+        flat[f"load/{mode}/throughput_per_s"] = load["throughput_per_s"]
+        for path, summary in load["endpoints"].items():
+            for key in LATENCY_KEYS: flat[f"load/{mode}{path}/{key}"] = summary[key]
+    return flat
+
+
+def compare(old, new, fail_over=None):
+    """Print old -> new for shared figures; returns the latency regressions worse than fail_over percent."""
+    old_flat, new_flat = flatten(old), flatten(new)
+    regressions = []
+    print(f"{'figure':<52} {'old':>11} {'new':>11} {'change':>8}")
+    for name in sorted(old_flat.keys() & new_flat.keys()):
+        before, after = old_flat[name], new_flat[name]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{name:<52} {before:>11.4f} {after:>11.4f} {change:>+7.1f}%")
+        if fail_over is not None and name.endswith("_ms") and change > fail_over: regressions.append((name, change))
+    return regressions
+
+
+def run(quick=False):
+    sizes = (100, 1000) if quick else bench_micro.DEFAULT_SIZES
+    requests = 500 if quick else 2000
+    results = {"micro": bench_micro.run(sizes)}
+    bench_micro.print_report(results["micro"])
+    results["load"] = {}
+    for mode in ("client", "server"):
+        results["load"][mode] = bench_load.run(mode, requests=requests)
+        bench_load.print_report(results["load"][mode])
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every benchmark and write one JSON result")
+    parser.add_argument("--quick", action="store_true", help="Smaller tables and fewer requests (smoke run)")
+    parser.add_argument("--json", help="Result file (default: benchmarks/results/suite-<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier suite result to compare against")
+    parser.add_argument("--fail-over", type=float, help="With --compare: exit 1 if any latency regressed by more than this percent")
+    args = parser.parse_args()
+    results = run(args.quick)
+    print(f"peak RSS: {results['peak_rss_mb']} MB")
+    print(f"wrote {write_results('suite', results, args.json)}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f: baseline = json.load(f)["results"]
+        regressions = compare(baseline, results, args.fail_over)
+        if regressions:
+            print(f"{len(regressions)} latency figures regressed by more than {args.fail_over}%")
+            sys.exit(1)
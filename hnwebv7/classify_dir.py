@@ -0,0 +1,190 @@
+# classify_dir.py - Classify every image under a directory without the web server
+#
+#   python classify_dir.py PHOTOS_DIR -o results.jsonl [--workers 8] [--format csv] [--fake-model 0.05]
+#
+# Walks the directory, pushes images through prepare_image and the vision model
+# on a bounded thread pool (at most 2 x workers images are read ahead, so memory
+# stays flat on dumps of tens of thousands of photos) and appends one record per
+# image to a JSONL or CSV file as soon as it is done. Files already listed in the
+# output are skipped, so an interrupted run continues where it stopped. Identical
+# photos are analyzed once (exact pixel hash). --fake-model uses the sleeping stub
+# from fake_model.py for end-to-end runs without an API key.
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff", ".heic")
+FIELDS = ("path", "object", "classification", "reason", "error", "duplicate_of", "bytes", "prep_ms", "model_ms", "confidence") # New columns go last so older CSV files still resume
+
+
+def find_images(root, extensions=IMAGE_EXTENSIONS):
+    """Relative paths of all images under root, in a stable (sorted) order."""
+    paths = []
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        paths += [os.path.relpath(os.path.join(directory, name), root) for name in sorted(files) if name.lower().endswith(extensions)]
+    return paths
+
+
+def _drop_partial_line(path):
+    # A crash can leave half a record at the end; cut it so the file parses and appends cleanly
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def completed_paths(output, fmt, retry_errors=False):
+    """Paths already recorded in an existing output file (records with errors too, unless retry_errors)."""
+    if not os.path.exists(output): return set()
+    _drop_partial_line(output)
+    done = set()
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = csv.DictReader(f) if fmt == "csv" else (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            if not (retry_errors and row.get("error")): done.add(row["path"])
+    return done
+
+
+class ResultWriter:
+    """Appends records to JSONL or CSV, flushed per record so a crash loses at most the line being written."""
+
+    def __init__(self, output, fmt):
+        self.fmt = fmt
+        new_file = not os.path.exists(output) or os.path.getsize(output) == 0
+        self._file = open(output, "a", newline="", encoding="utf-8")
+        if fmt == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=FIELDS, extrasaction="ignore")
+            if new_file: self._csv.writeheader()
+
+    def write(self, record):
+        if self.fmt == "csv": self._csv.writerow(record)
+        else: self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class Progress:
+    """Throttled one-line progress report on stderr."""
+
+    def __init__(self, total, interval=2.0):
+        self.total, self.interval = total, interval
+        self.start = self._last = time.perf_counter()
+        self.done = self.errors = self.duplicates = self.model_calls = 0
+
+    def update(self, record, force=False):
+        if record is not None:
+            self.done += 1
+            if record["error"]: self.errors += 1
+            if record["duplicate_of"]: self.duplicates += 1
+            if record["model_ms"] is not None: self.model_calls += 1
+        now = time.perf_counter()
+        if not force and now - self._last < self.interval: return
+        self._last = now
+        rate = self.done / max(now - self.start, 1e-9)
+        eta = (self.total - self.done) / rate if rate else 0
+        print(f"\r{self.done}/{self.total} images  {rate:.1f}/s  errors {self.errors}  duplicates {self.duplicates}  "
+              f"elapsed {now - self.start:.0f}s  eta {eta:.0f}s", end="", file=sys.stderr, flush=True)
+
+
+def classify_file(app, root, rel_path, seen, seen_lock):
+    """Prepare one image, reuse the result of an identical earlier image or call the model; returns a record."""
+    record = dict.fromkeys(FIELDS)
+    record["path"] = rel_path
+    try:
+        with open(os.path.join(root, rel_path), "rb") as f: data = f.read()
+        record["bytes"] = len(data)
+        prepared = app.prepare_image(data, max_edge=app.IMAGE_MAX_EDGE, encode_format=app.IMAGE_ENCODE_FORMAT, quality=app.IMAGE_ENCODE_QUALITY, max_pixels=app.IMAGE_MAX_PIXELS)
+    except (OSError, ValueError) as e:
+        record.update(classification="Error", error=str(e))
+        return record
+    record["prep_ms"] = prepared.metrics["total_ms"]
+    image_hash = app.exact_hash(prepared.image)
+    with seen_lock:
+        first = seen.get(image_hash)
+        if first is None: seen[image_hash] = first = {"path": rel_path, "done": threading.Event(), "result": None}
+    if first["path"] != rel_path: # Same pixels as an earlier file: wait for (or reuse) its answer
+        first["done"].wait()
+        record.update(first["result"], duplicate_of=first["path"])
+        return record
+    try:
+        start = time.perf_counter()
+        parsed = app.parse_result_to_dict(app.analyze_image_with_ai(prepared.payload))
+        record["model_ms"] = round((time.perf_counter() - start) * 1e3, 2)
+        record.update(parsed)
+        first["result"] = parsed
+    finally:
+        if first["result"] is None: first["result"] = {"classification": "Error", "error": "Analysis of the identical image failed."}
+        first["done"].set()
+    return record
+
+
+def run(root, output, fmt="jsonl", workers=4, retry_errors=False, limit=None, progress_interval=2.0):
+    import app # Imported here so --fake-model can set VISION_MODEL first
+    if app.VISION.get() is None: raise SystemExit(f"Vision model not available: {app.VISION.error}")
+    done = completed_paths(output, fmt, retry_errors)
+    todo = [p for p in find_images(root) if p not in done]
+    if limit: todo = todo[:limit]
+    print(f"{len(done)} already in {output}; classifying {len(todo)} images with {workers} workers", file=sys.stderr)
+
+    writer, progress = ResultWriter(output, fmt), Progress(len(todo), progress_interval)
+    seen, seen_lock = {}, threading.Lock()
+    paths = iter(todo)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="classify") as pool:
+            pending = set()
+            try:
+                while True:
+                    # Keep a bounded window of work queued; results are written as they complete
+                    for rel_path in paths:
+                        pending.add(pool.submit(classify_file, app, root, rel_path, seen, seen_lock))
+                        if len(pending) >= 2 * workers: break
+                    if not pending: break
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        record = future.result()
+                        writer.write(record)
+                        progress.update(record)
+            except KeyboardInterrupt:
+                pool.shutdown(wait=False, cancel_futures=True) # Unwritten files are picked up again on the next run
+                raise
+    finally:
+        writer.close()
+        progress.update(None, force=True)
+        print(file=sys.stderr)
+    elapsed = time.perf_counter() - progress.start
+    return {"classified": progress.done, "skipped": len(done), "errors": progress.errors, "duplicates": progress.duplicates,
+            "model_calls": progress.model_calls, "elapsed_s": round(elapsed, 2),
+            "images_per_s": round(progress.done / elapsed, 2) if elapsed else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classify every image under a directory into a JSONL/CSV file (resumable).")
+    parser.add_argument("directory")
+    parser.add_argument("-o", "--output", required=True, help="Results file; existing entries are skipped")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="Default: from the output extension (.csv -> csv, else jsonl)")
+    parser.add_argument("-w", "--workers", type=int, default=int(os.environ.get("MODEL_MAX_IN_FLIGHT", "4")), help="Concurrent model calls")
+    parser.add_argument("--retry-errors", action="store_true", help="Re-run files whose earlier record has an error")
+    parser.add_argument("--limit", type=int, help="Classify at most this many new files")
+    parser.add_argument("--fake-model", type=float, metavar="DELAY", help="Use the local fake model with this delay in seconds")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.directory): parser.error(f"{args.directory} is not a directory")
+    if args.fake_model is not None: os.environ.update(VISION_MODEL="fake", FAKE_MODEL_DELAY=str(args.fake_model))
+    os.environ.setdefault("VISION_WARMUP", "lazy")
+    os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+    fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    try: summary = run(args.directory, args.output, fmt, max(1, args.workers), args.retry_errors, args.limit)
+    except KeyboardInterrupt: sys.exit(f"Interrupted; run the same command again to continue with the remaining files in {args.output}.")
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# fake_model.py - Local stand-in for the Gemini vision model
+
+# Lets the image endpoints, load tests and benchmarks run without an API key
+# or network access. Enable in app.py with VISION_MODEL=fake; FAKE_MODEL_DELAY
+# sets the simulated round-trip time in seconds and FAKE_MODEL_TOKEN_DELAY adds
+# seconds per output token (~4 characters), so short answers come back sooner,
+# as they do from the real model. Answers are JSON in the shape of
+# model_output.RESPONSE_SCHEMA (an array for multi-image prompts); label-only
+# prompts (app.LABEL_ANALYSIS_PROMPT) get just the object name.
+
+import json
+import time
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.parts = [text] if text else []
+        self.prompt_feedback = None
+
+
+class FakeVisionModel:
+    """Mimics GenerativeModel.generate_content: sleeps, then returns a canned answer."""
+
+    def __init__(self, delay=1.0, text=None, token_delay=0.0, label=None):
+        self.delay = delay
+        self.token_delay = token_delay
+        self.text = text or json.dumps({"object": "Plastic Bottle", "classification": "Recycling", "reason": "Rigid #1 PET bottles are widely accepted curbside.", "confidence": 0.9})
+        if label is None:
+            try: label = json.loads(self.text)["object"].lower()
+            except (ValueError, KeyError, TypeError, AttributeError): label = "unknown" # A deliberately malformed canned answer
+        self.label = label
+        self.calls = 0
+
+    def generate_content(self, contents, **kwargs):
+        self.calls += 1
+        images = sum(1 for part in contents if not isinstance(part, str))
+        if contents and isinstance(contents[0], str) and "name only" in contents[0]: text = self.label
+        elif images <= 1: text = self.text
+        else: text = "[" + ", ".join([self.text] * images) + "]" # Multi-image prompt: a JSON array, one answer per image
+        delay = self.delay + self.token_delay * (len(text) / 4)
+        if delay: time.sleep(delay)
+        return FakeResponse(text)
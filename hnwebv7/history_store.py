@@ -0,0 +1,168 @@
+# history_store.py - Append-only SQLite log of /sort and /analyze_image outcomes
+
+# Requests only put a tuple on a queue; a background thread writes whatever has
+# accumulated in one transaction every flush_interval seconds (or once
+# batch_size rows are waiting), so recording never adds a disk write to request
+# latency. WAL mode lets the query helpers read while the writer appends. If the
+# writer falls behind by more than max_queue rows, new events are dropped (and
+# counted) rather than blocking requests. A batch that fails to write (disk
+# full, locked file) is logged and counted as failed; the writer reconnects and
+# carries on with the next one.
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger("smartsort")
+
+UNKNOWN_SORT_STATUSES = ("not_found", "suggestion_found", "multiple_suggestions_found")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,          -- Unix time
+    kind TEXT NOT NULL,        -- 'sort' or 'image'
+    location TEXT,             -- Location value from the request (sort)
+    query TEXT,                -- Normalized query (sort)
+    image_hash TEXT,           -- Exact pixel hash (image)
+    status TEXT,               -- found / not_found / ... (sort), ok / error (image)
+    category TEXT,             -- Rule category (sort) or model classification (image)
+    object TEXT,               -- Object named by the model (image)
+    latency_ms REAL,
+    cache_hit INTEGER NOT NULL DEFAULT 0,
+    rules_version INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_location_ts ON events (location, ts);
+CREATE INDEX IF NOT EXISTS events_category_ts ON events (category, ts);
+CREATE INDEX IF NOT EXISTS events_kind_status_location_ts ON events (kind, status, location, ts);
+"""
+
+INSERT = ("INSERT INTO events (ts, kind, location, query, image_hash, status, category, object, latency_ms, cache_hit, rules_version) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+class HistoryStore:
+    def __init__(self, db_path, batch_size=500, flush_interval=1.0, max_queue=10000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._flushed = threading.Condition()
+        self._counts = threading.Lock() # enqueued/dropped are bumped from many request threads
+        self.enqueued = self.written = self.failed = self.dropped = self.batches = 0
+        db = self._connect()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+        db.close()
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        db.execute("PRAGMA synchronous=NORMAL") # Safe with WAL; avoids an fsync per commit
+        return db
+
+    # --- Recording (called on request threads; never blocks) ---
+    def _put(self, row):
+        try:
+            self._queue.put_nowait(row)
+            with self._counts: self.enqueued += 1
+        except queue.Full:
+            with self._counts: self.dropped += 1
+
+    def record_sort(self, location, query, status, category, latency_ms, cache_hit=False, rules_version=None):
+        self._put((time.time(), "sort", location, query, None, status, category, None, latency_ms, int(cache_hit), rules_version))
+
+    def record_image(self, image_hash, status, classification, object_name, latency_ms, cache_hit=False, location=None, rules_version=None):
+        self._put((time.time(), "image", location, None, image_hash, status, classification, object_name, latency_ms, int(cache_hit), rules_version))
+
+    # --- Background writer ---
+    def _writer(self):
+        db = None
+        while True:
+            batch = []
+            try: batch.append(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty: pass
+            deadline = time.monotonic() + self.flush_interval
+            while batch and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0: break
+                try: batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty: break
+            if batch:
+                try:
+                    if db is None: db = self._connect()
+                    with db: db.executemany(INSERT, batch)
+                    self.written += len(batch)
+                    self.batches += 1
+                except Exception as e: # Keep the thread alive: lose this batch, not every later event
+                    logger.error("History write of %d events to %s failed: %s", len(batch), self.db_path, e)
+                    self.failed += len(batch)
+                    if db is not None:
+                        try: db.close()
+                        except Exception: pass
+                    db = None # Reconnect for the next batch
+            with self._flushed:
+                self._flushed.notify_all()
+                if self._closed and self._queue.empty(): break
+        if db is not None: db.close()
+
+    def flush(self, timeout=10.0):
+        """Block until everything queued so far has been written, or has failed to write (tests, shutdown, admin queries)."""
+        with self._counts: target = self.enqueued
+        deadline = time.monotonic() + timeout
+        with self._flushed:
+            while self.written + self.failed < target and time.monotonic() < deadline:
+                self._flushed.wait(min(self.flush_interval, 0.1))
+
+    def close(self):
+        self._closed = True
+        self._thread.join(self.flush_interval * 2 + 5)
+
+    def stats(self):
+        return {"db_path": self.db_path, "queued": self._queue.qsize(), "written": self.written,
+                "failed": self.failed, "dropped": self.dropped, "batches": self.batches}
+
+    # --- Queries (fresh read connection each; WAL readers do not block the writer) ---
+    def _query(self, sql, params):
+        db = self._connect()
+        try:
+            db.row_factory = sqlite3.Row
+            return [dict(row) for row in db.execute(sql, params)]
+        finally: db.close()
+
+    @staticmethod
+    def _window(since, until):
+        return (since if since is not None else 0.0), (until if until is not None else time.time() + 1)
+
+    def top_unknown_queries(self, location=None, since=None, until=None, limit=20):
+        """Most frequent /sort queries that matched no rule (suggestions included), per location, busiest first."""
+        since, until = self._window(since, until)
+        placeholders = ",".join("?" * len(UNKNOWN_SORT_STATUSES))
+        sql = (f"SELECT location, query, COUNT(*) AS count, MAX(ts) AS last_seen FROM events "
+               f"WHERE kind = 'sort' AND status IN ({placeholders}) AND ts >= ? AND ts < ?")
+        params = [*UNKNOWN_SORT_STATUSES, since, until]
+        if location is not None:
+            sql += " AND location = ?"
+            params.append(location)
+        sql += " GROUP BY location, query ORDER BY count DESC, last_seen DESC LIMIT ?"
+        return self._query(sql, params + [limit])
+
+    def category_counts(self, kind=None, location=None, since=None, until=None):
+        """Events per (kind, category, status) in a time range, optionally for one location."""
+        since, until = self._window(since, until)
+        sql = ("SELECT kind, category, status, COUNT(*) AS count, ROUND(AVG(latency_ms), 3) AS avg_latency_ms, "
+               "SUM(cache_hit) AS cache_hits FROM events WHERE ts >= ? AND ts < ?")
+        params = [since, until]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        if location is not None:
+            sql += " AND location = ?"
+            params.append(location)
+        sql += " GROUP BY kind, category, status ORDER BY count DESC"
+        return self._query(sql, params)
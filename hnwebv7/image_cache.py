@@ -0,0 +1,115 @@
+# image_cache.py - Content-hash result cache for /analyze_image
+
+# Kiosks and the webcam client often re-send the same (or nearly the same)
+# frame. Results from parse_result_to_dict are cached under a SHA-256 of the
+# decoded pixels, with an optional 64-bit dHash match within a Hamming-distance
+# threshold for near-duplicates. Entries can be mirrored to SQLite so the
+# cache survives restarts.
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DHASH_SIZE = 8 # 8x8 gradient bits -> 64-bit hash
+
+
+def exact_hash(img):
+    """SHA-256 over the decoded pixels (mode and size included)."""
+    h = hashlib.sha256()
+    h.update(f"{img.mode}:{img.size[0]}x{img.size[1]}:".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def dhash(img, size=DHASH_SIZE):
+    """Difference hash: compares horizontally adjacent pixels of a tiny grayscale copy."""
+    from PIL import Image # Imported on first use so text-only processes never load PIL
+    small = img.convert('L').resize((size + 1, size), Image.BILINEAR)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] < pixels[offset + col + 1])
+    return bits
+
+
+def is_label_only(result):
+    return result.get("analysis") == "label"
+
+
+class ImageResultCache:
+    """LRU cache of parsed analysis results, optionally backed by SQLite."""
+
+    def __init__(self, maxsize=256, phash_distance=None, db_path=None):
+        self.maxsize = maxsize
+        self.phash_distance = phash_distance # None disables near-duplicate matching
+        self._data = OrderedDict() # exact hash -> (dhash, result)
+        self._lock = threading.Lock()
+        self.hits = self.label_hits = self.perceptual_hits = self.misses = self.evictions = 0
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS image_results (exact_hash TEXT PRIMARY KEY, dhash TEXT, result TEXT NOT NULL, updated_at REAL NOT NULL)")
+            self._db.commit()
+            self._load()
+
+    def _load(self):
+        rows = self._db.execute("SELECT exact_hash, dhash, result FROM image_results ORDER BY updated_at DESC LIMIT ?", (self.maxsize,)).fetchall()
+        for exact, phash, result in reversed(rows):
+            self._data[exact] = (int(phash, 16) if phash else None, json.loads(result))
+
+    def lookup(self, exact, phash=None, label_ok=False):
+        """Return (result, match) where match is 'exact', 'perceptual' or None.
+
+        Label-only entries ("analysis": "label", from rule-first requests) are
+        returned only when label_ok is set; otherwise they count as misses, since
+        the caller still has to call the model for a full answer.
+        """
+        with self._lock:
+            entry = self._data.get(exact)
+            if entry is not None and (label_ok or not is_label_only(entry[1])):
+                self._data.move_to_end(exact)
+                self._count_hit(entry[1])
+                return dict(entry[1]), "exact"
+            if self.phash_distance is not None and phash is not None:
+                best_key, best_distance = None, self.phash_distance + 1
+                for key, (stored, result) in self._data.items():
+                    if stored is None or (not label_ok and is_label_only(result)): continue
+                    distance = bin(stored ^ phash).count("1")
+                    if distance < best_distance: best_key, best_distance = key, distance
+                if best_key is not None:
+                    self._data.move_to_end(best_key)
+                    self._count_hit(self._data[best_key][1])
+                    self.perceptual_hits += 1
+                    return dict(self._data[best_key][1]), "perceptual"
+            self.misses += 1
+            return None, None
+
+    def _count_hit(self, result):
+        # hits are full answers served from the cache; a label still needs the rules (and maybe the full model call)
+        if is_label_only(result): self.label_hits += 1
+        else: self.hits += 1
+
+    def store(self, exact, phash, result):
+        if self.maxsize <= 0: return
+        with self._lock:
+            self._data[exact] = (phash, dict(result))
+            self._data.move_to_end(exact)
+            evicted = []
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[0])
+                self.evictions += 1
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO image_results VALUES (?, ?, ?, ?)", (exact, None if phash is None else format(phash, '016x'), json.dumps(result), time.time()))
+                self._db.executemany("DELETE FROM image_results WHERE exact_hash = ?", [(key,) for key in evicted])
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "phash_distance": self.phash_distance,
+                    "persistent": self._db is not None, "hits": self.hits, "label_hits": self.label_hits, "perceptual_hits": self.perceptual_hits,
+                    "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,71 @@
+# image_prep.py - Decode, orient, downscale and re-encode uploads before the model call
+
+# Phone cameras upload 12-megapixel JPEGs, but the vision model does not need
+# anywhere near that many pixels to name a bottle. JPEGs are decoded in draft
+# mode (DCT scaling inside libjpeg) so a huge image is never fully decoded,
+# EXIF orientation is applied, the long edge is capped and the result is
+# re-encoded as JPEG/WebP. Every stage is timed so payload size can be tuned
+# against classification accuracy.
+
+import io
+import time
+
+ENCODE_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+DEFAULT_MAX_PIXELS = 64_000_000 # Well above a 48 MP phone photo; a tiny PNG can claim 20000x20000 and take GBs to decode
+
+
+class PreparedImage:
+    """Preprocessed upload: the PIL image, the model payload and per-stage metrics."""
+
+    __slots__ = ("image", "payload", "metrics")
+
+    def __init__(self, image, payload, metrics):
+        self.image = image     # Final RGB PIL image (also what the result cache hashes)
+        self.payload = payload # What goes to generate_content: a {"mime_type", "data"} blob or the PIL image
+        self.metrics = metrics
+
+
+def prepare_image(data, max_edge=1024, encode_format="JPEG", quality=85, max_pixels=DEFAULT_MAX_PIXELS):
+    """Run the preprocessing stages on raw upload bytes; raises ValueError if they are not an image.
+
+    max_edge <= 0 keeps the original resolution; an empty encode_format hands
+    the PIL image to the model unchanged (the SDK then encodes it itself).
+    Images with more than max_pixels pixels are rejected before decoding.
+    """
+    import PIL.Image # Imported on first use so text-only processes never load PIL
+    import PIL.ImageOps
+    metrics = {"input_bytes": len(data)}
+    t0 = time.perf_counter()
+    try:
+        img = PIL.Image.open(io.BytesIO(data))
+        metrics["source_format"] = img.format
+        metrics["source_size"] = list(img.size)
+        if img.size[0] * img.size[1] > max_pixels:
+            raise ValueError(f"Image is {img.size[0]}x{img.size[1]} pixels; the limit is {max_pixels} pixels")
+        if max_edge > 0 and img.format == "JPEG":
+            img.draft("RGB", (max_edge, max_edge)) # Decoder-side downscale by 1/2, 1/4 or 1/8
+        img.load()
+    except PIL.Image.DecompressionBombError as e: raise ValueError(f"Image is too large to decode: {e}")
+    except (PIL.UnidentifiedImageError, OSError) as e: raise ValueError(f"Could not decode image: {e}")
+    t1 = time.perf_counter()
+
+    img = PIL.ImageOps.exif_transpose(img)
+    t2 = time.perf_counter()
+
+    if max_edge > 0 and max(img.size) > max_edge: img.thumbnail((max_edge, max_edge), PIL.Image.LANCZOS)
+    if img.mode != "RGB": img = img.convert("RGB")
+    t3 = time.perf_counter()
+
+    payload = img
+    if encode_format:
+        buffer = io.BytesIO()
+        img.save(buffer, format=encode_format, quality=quality)
+        payload = {"mime_type": ENCODE_MIME_TYPES[encode_format], "data": buffer.getvalue()}
+        metrics["output_bytes"] = len(payload["data"])
+    t4 = time.perf_counter()
+
+    metrics.update({"output_size": list(img.size), "output_format": encode_format or None,
+                    "decode_ms": round((t1 - t0) * 1e3, 2), "orient_ms": round((t2 - t1) * 1e3, 2),
+                    "resize_ms": round((t3 - t2) * 1e3, 2), "encode_ms": round((t4 - t3) * 1e3, 2),
+                    "total_ms": round((t4 - t0) * 1e3, 2)})
+    return PreparedImage(img, payload, metrics)
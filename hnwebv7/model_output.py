@@ -0,0 +1,128 @@
+# model_output.py - Prompts, response schema and the strict parser for the vision model's classification answers
+
+# The model is asked for JSON matching RESPONSE_SCHEMA (Gemini JSON mode via
+# GENERATION_CONFIG) instead of "Object: / Classification: / Reason:" lines, so
+# an answer either parses into exactly these fields or is reported as an error.
+# Nothing half-parsed gets through to the image cache or the history store.
+# The classification is one of CLASSIFICATIONS, compared without regard to case
+# or spacing and returned in canonical spelling, so downstream keys never split on
+# "recycling" vs "Recycling". app.py and the PC script
+# ("# --- Python Script for PC: Webcam OR Fi.py") share this module.
+
+import json
+
+CLASSIFICATIONS = ("Recycling", "Trash", "Uncertain/Check Locally")
+ERROR_CLASSIFICATION = "Error"
+# Failure strings produced by the callers in place of a model answer (API errors, blocked or empty responses)
+ERROR_PREFIXES = ("error", "analysis failed", "analysis blocked")
+MALFORMED_RESPONSE = "Malformed AI response" # Start of the error for answers that are not schema-valid JSON
+
+RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "object": {"type": "STRING", "description": "Name of the single main object"},
+        "classification": {"type": "STRING", "enum": list(CLASSIFICATIONS)},
+        "reason": {"type": "STRING", "description": "1-2 short sentences"},
+        "confidence": {"type": "NUMBER", "description": "0 to 1"},
+    },
+    "required": ["object", "classification", "reason", "confidence"],
+}
+BATCH_RESPONSE_SCHEMA = {"type": "ARRAY", "items": RESPONSE_SCHEMA}
+GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": RESPONSE_SCHEMA}
+BATCH_GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": BATCH_RESPONSE_SCHEMA}
+
+IMAGE_ANALYSIS_PROMPT = """
+        From the provided image, identify the single, main object clearly visible. State the object's name.
+        Based on common US recycling guidelines (mention rules can vary by location, especially for specific plastics like #3-#7),
+        classify this object as 'Recycling', 'Trash', or 'Uncertain/Check Locally'.
+        Provide a brief reason for the classification (max 1-2 short sentences) and your confidence from 0 to 1.
+        Answer with a JSON object: {"object": ..., "classification": ..., "reason": ..., "confidence": ...}
+        """
+
+# Several photos in one request: the long instructions are sent (and billed) once
+BATCH_IMAGE_ANALYSIS_PROMPT = """
+        You are given {count} images, numbered 1 to {count} in the order they appear.
+        For EACH image, identify the single, main object clearly visible. State the object's name.
+        Based on common US recycling guidelines (mention rules can vary by location, especially for specific plastics like #3-#7),
+        classify this object as 'Recycling', 'Trash', or 'Uncertain/Check Locally'.
+        Provide a brief reason for the classification (max 1-2 short sentences) and your confidence from 0 to 1.
+        Answer with a JSON array of {count} objects in image order, each {{"object": ..., "classification": ..., "reason": ..., "confidence": ...}}
+        """
+
+_CANONICAL = {" ".join(c.lower().replace("/", " / ").split()): c for c in CLASSIFICATIONS}
+
+
+class MalformedResponse(ValueError): pass
+
+
+def is_error_text(raw):
+    return raw.lstrip()[:16].lower().startswith(ERROR_PREFIXES)
+
+
+def canonical_classification(value):
+    """CLASSIFICATIONS spelling of value (case and spacing ignored), or None."""
+    if value in CLASSIFICATIONS: return value # JSON mode answers spell the enum exactly
+    if not isinstance(value, str): return None
+    return _CANONICAL.get(" ".join(value.lower().replace("/", " / ").split()))
+
+
+def _decode(raw):
+    if raw[0] == "{": text = raw # JSON mode: the answer is the bare object
+    else:
+        text = raw.strip()
+        if text.startswith("```"): # Fenced answer ("```json ... ```") from a model not in JSON mode
+            text = text[3:].rsplit("```", 1)[0]
+            if text[:4].lower() == "json": text = text[4:]
+    try: return json.loads(text)
+    except ValueError as e: raise MalformedResponse(f"not JSON ({e})") from None
+
+
+def validate(data):
+    """{object, classification, reason, confidence} from a decoded answer; raises MalformedResponse."""
+    if not isinstance(data, dict): raise MalformedResponse(f"expected a JSON object, got {type(data).__name__}")
+    name, reason, confidence = data.get("object"), data.get("reason", "N/A"), data.get("confidence")
+    if not isinstance(name, str) or not name.strip(): raise MalformedResponse("missing object name")
+    classification = canonical_classification(data.get("classification"))
+    if classification is None: raise MalformedResponse(f"classification {data.get('classification')!r} is not one of {', '.join(CLASSIFICATIONS)}")
+    if not isinstance(reason, str): raise MalformedResponse("reason is not a string")
+    if confidence is not None and (isinstance(confidence, bool) or not isinstance(confidence, (int, float)) or not 0 <= confidence <= 1):
+        raise MalformedResponse(f"confidence {confidence!r} is not a number from 0 to 1")
+    return {"object": name.strip(), "classification": classification, "reason": reason.strip() or "N/A",
+            "confidence": None if confidence is None else float(confidence), "error": None}
+
+
+def error_result(message):
+    return {"object": "Unknown", "classification": ERROR_CLASSIFICATION, "reason": "N/A", "confidence": None, "error": message}
+
+
+def parse_result(raw):
+    """Result dict for one answer: raw JSON text, an already-decoded object (batch items) or a caller's error string.
+
+    Never raises; anything that is not a valid answer comes back with "error"
+    set and classification "Error".
+    """
+    if isinstance(raw, dict):
+        try: return validate(raw)
+        except MalformedResponse as e: return error_result(f"{MALFORMED_RESPONSE}: {e}")
+    if not raw or not isinstance(raw, str): return error_result("Invalid analysis result.")
+    if raw[0] != "{" and is_error_text(raw): return error_result(raw.strip())
+    try: return validate(_decode(raw))
+    except MalformedResponse as e: return error_result(f"{MALFORMED_RESPONSE}: {e}")
+
+
+def split_batch(raw, count):
+    """One entry per image from a batch answer (a JSON array): decoded objects, or error strings for parse_result."""
+    if not raw or not isinstance(raw, str): return ["Analysis Failed: Invalid batch result."] * count
+    if is_error_text(raw): return [raw] * count
+    try: data = _decode(raw)
+    except MalformedResponse as e: return [f"Analysis Failed: Malformed batch response: {e}"] * count
+    if isinstance(data, dict) and count == 1: data = [data]
+    if not isinstance(data, list): return [f"Analysis Failed: Batch response is a JSON {type(data).__name__}, not an array."] * count
+    return data[:count] + ["Analysis Failed: No result for this image in the batch response."] * (count - len(data))
+
+
+def format_result(result):
+    """Display text for a result dict (the PC script's console and webcam overlay)."""
+    if result["error"]: return result["error"]
+    confidence = f" ({result['confidence']:.0%} sure)" if result.get("confidence") is not None else ""
+    return f"Object: {result['object']}\nClassification: {result['classification']}{confidence}\nReason: {result['reason']}"
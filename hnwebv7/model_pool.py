@@ -0,0 +1,124 @@
+# model_pool.py - Bounded worker pool for vision model calls
+
+# A generate_content round trip takes seconds. Running it on a dedicated pool
+# caps how many model calls are in flight, bounds how many more may wait, and
+# lets the request give up after a timeout, so a burst of image uploads cannot
+# tie up every server thread and starve the fast /sort lookups.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+
+class PoolSaturatedError(Exception):
+    """Raised when max_in_flight calls are running and max_queue more are already waiting."""
+
+
+class ModelCallTimeoutError(Exception):
+    """Raised when a model call did not finish within the request timeout."""
+
+
+class ModelCallPool:
+    def __init__(self, max_in_flight=4, max_queue=8, timeout=30.0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.timeout = timeout or None
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="model-call")
+        # One admission slot per running or waiting call. A slot is only freed
+        # when the call itself finishes, so timed-out requests cannot let
+        # abandoned work pile up behind the pool.
+        self._admission = threading.BoundedSemaphore(max_in_flight + max_queue)
+        self._lock = threading.Lock()
+        self.admitted = self.in_flight = 0
+        self.completed = self.failed = self.rejected = self.timeouts = 0
+
+    def _call(self, fn, args, kwargs):
+        with self._lock: self.in_flight += 1
+        try:
+            result = fn(*args, **kwargs)
+            with self._lock: self.completed += 1
+            return result
+        except Exception:
+            with self._lock: self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.admitted -= 1
+            self._admission.release()
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn on the pool and wait for it; raises PoolSaturatedError or ModelCallTimeoutError."""
+        if not self._admission.acquire(blocking=False):
+            with self._lock: self.rejected += 1
+            raise PoolSaturatedError(f"{self.max_in_flight} model calls running and {self.max_queue} queued")
+        with self._lock: self.admitted += 1
+        future = self._executor.submit(self._call, fn, args, kwargs)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock: self.timeouts += 1
+            raise ModelCallTimeoutError(f"Model call exceeded {self.timeout}s")
+
+    def stats(self):
+        with self._lock:
+            return {"max_in_flight": self.max_in_flight, "max_queue": self.max_queue, "timeout": self.timeout,
+                    "in_flight": self.in_flight, "queued": self.admitted - self.in_flight,
+                    "completed": self.completed, "failed": self.failed, "rejected": self.rejected, "timeouts": self.timeouts}
+
+
+class MicroBatcher:
+    """Coalesces concurrent single calls that arrive within a short window into one batch call.
+
+    The first caller of a window becomes the leader: it waits up to `window`
+    seconds (or until max_batch items are queued), runs batch_fn on everything
+    collected, and hands each follower its own result or exception.
+    """
+
+    class _Slot:
+        __slots__ = ("item", "result", "error", "done")
+
+        def __init__(self, item):
+            self.item = item
+            self.result = self.error = None
+            self.done = threading.Event()
+
+    def __init__(self, batch_fn, window=0.05, max_batch=8):
+        self.batch_fn = batch_fn # list of items -> list of results, same order
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending = []
+        self._full = threading.Event()
+        self.batches = self.items = 0
+
+    def run(self, item):
+        slot = self._Slot(item)
+        with self._lock:
+            batch, full = self._pending, self._full
+            batch.append(slot)
+            leader = len(batch) == 1
+            if len(batch) >= self.max_batch: # Close this batch; later arrivals start the next one
+                full.set()
+                self._pending, self._full = [], threading.Event()
+        if not leader:
+            slot.done.wait()
+        else:
+            full.wait(self.window)
+            with self._lock:
+                if self._pending is batch: self._pending, self._full = [], threading.Event()
+                self.batches += 1
+                self.items += len(batch)
+            try:
+                for pending, result in zip(batch, self.batch_fn([p.item for p in batch])): pending.result = result
+            except Exception as e:
+                for pending in batch: pending.error = e
+            finally:
+                for pending in batch: pending.done.set()
+        if slot.error is not None: raise slot.error
+        return slot.result
+
+    def stats(self):
+        with self._lock:
+            return {"window": self.window, "max_batch": self.max_batch, "batches": self.batches, "items": self.items,
+                    "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0}
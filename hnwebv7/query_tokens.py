@@ -0,0 +1,68 @@
+# query_tokens.py - Word-level matching of every rule item in a /sort query
+
+# TermIndex answers "which single term occurs in this string", so "pizza box and
+# plastic bag" yields one item and "can" is found inside "scan". TokenIndex
+# works on normalized words instead: the query is lowercased, apostrophes are
+# dropped, anything that is not a letter or digit splits words, and each word
+# is reduced to a crude singular ("boxes" -> "box", "batteries" -> "battery").
+# Rule terms are normalized the same way when the index is built into a word
+# trie, and find_all walks the query once, taking the longest term that starts
+# at each word and skipping past it, so every item comes back in query order.
+
+import re
+from functools import lru_cache
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+@lru_cache(maxsize=8192) # Query words repeat heavily; the cache keeps normalize() cheaper than the substring scan
+def stem(word):
+    """Crude plural -> singular; only has to agree with itself, since terms and queries both go through it."""
+    if len(word) <= 3 or word[-1] != "s" or word.endswith(("ss", "us", "is")): return word
+    if word.endswith("ies") and len(word) > 4: return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes", "zes")): return word[:-2]
+    return word[:-1]
+
+
+def normalize(text):
+    """Lowercased, punctuation-free, singularized words of text."""
+    text = text.lower()
+    if text.replace(" ", "").isalnum(): return list(map(stem, text.split())) # Plain words: skip the regex
+    return list(map(stem, _WORD.findall(text.replace("'", "").replace("’", ""))))
+
+
+class TokenIndex:
+    """Word trie over rule and alias terms; find_all returns every term in a query on word boundaries."""
+
+    __slots__ = ("_root",)
+
+    def __init__(self, terms, rules):
+        root = {}
+        for term in terms:
+            node = root
+            for word in normalize(term):
+                node = node.setdefault(word, {})
+            # Two terms can normalize alike ("battery"/"batteries"); keep a rule item over an alias
+            if node is not root and (None not in node or (term in rules and node[None] not in rules)): node[None] = term
+        self._root = root
+
+    def find_all(self, query):
+        """Terms found in query, leftmost-longest and non-overlapping, in query order."""
+        words = normalize(query)
+        root = self._root
+        found = []
+        i, n = 0, len(words)
+        while i < n:
+            node = root.get(words[i])
+            i += 1
+            if node is None: continue # Most words start no term
+            term, end, j = node.get(None), i, i
+            while j < n:
+                node = node.get(words[j])
+                if node is None: break
+                j += 1
+                if None in node: term, end = node[None], j
+            if term is not None:
+                found.append(term)
+                i = end
+        return found
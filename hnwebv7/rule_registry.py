@@ -0,0 +1,270 @@
+# rule_registry.py - Location rule sets loaded from files instead of hardcoded dicts
+
+# Each jurisdiction lives in rules/<location_value>.json (or .yaml/.yml when
+# PyYAML is installed):
+#
+#   {"rules_source": "Fairfax County, VA", "display_location": "Fairfax County, VA",
+#    "aliases": {...optional, merged over the shared ones...},
+#    "rules": {"plastic bottle": {"category": "Recyclable", "notes": "..."}, ...}}
+#
+# A file may name a "parent" location (county -> state -> us). It then lists
+# only what differs: its rules and aliases are applied over the parent's
+# flattened table (a null rule removes an inherited item), and the merged view
+# is precomputed when the location loads, so a lookup is still one probe. A
+# location whose item names and aliases match its parent's reuses the parent's
+# TermIndex. A location value without a file resolves to its nearest ancestor
+# by dropping leading "_" parts ("reston_va" -> "va"), then to the default.
+#
+# rules/_aliases.json holds the aliases shared by every location. Startup only
+# lists the directory; a location is parsed, validated and indexed the first
+# time it is requested, so hundreds of jurisdictions cost nothing until used.
+#
+# Validated rules are stored compactly (rule_store.py): item names and identical
+# rules are shared by every location of one registry instead of being repeated
+# per file. Each reload builds a new registry with its own vocabulary, so
+# edited or removed rules are freed along with the version that used them.
+#
+# HotRuleRegistry keeps the active RuleRegistry and replaces it at runtime: the
+# new version is parsed and indexed off the request path, then swapped in with
+# a single reference assignment, so a request never sees a half-built table.
+
+import json
+import logging
+import os
+import threading
+import time
+
+from rule_store import RuleVocabulary
+from term_index import TermIndex
+
+logger = logging.getLogger("smartsort") # Same logger as app.py
+
+try:
+    import yaml # Optional: only needed for .yaml/.yml rule files
+except ImportError:
+    yaml = None
+YAML_ERRORS = (yaml.YAMLError,) if yaml else ()
+
+RULE_FILE_EXTENSIONS = (".json", ".yaml", ".yml")
+SHARED_ALIASES_NAME = "_aliases"
+
+
+class RuleValidationError(ValueError):
+    """A rule file is malformed; the message names the file and the offending entry."""
+
+
+class RuleSet:
+    """One location's validated rules (CompactRules or a plain dict), merged aliases and precompiled TermIndex."""
+
+    __slots__ = ("key", "rules_source", "display_location", "rules", "aliases", "term_index", "parent")
+
+    def __init__(self, key, rules_source, display_location, rules, aliases, parent=None):
+        self.key = key
+        self.rules_source = rules_source
+        self.display_location = display_location
+        self.rules = rules
+        self.aliases = aliases
+        self.parent = parent # Parent RuleSet or None
+        if parent is not None and aliases is parent.aliases and len(rules) == len(parent.rules) and all(item in parent.rules for item in rules):
+            self.term_index = parent.term_index # Same terms: only categories/notes were overridden
+        else: self.term_index = TermIndex(rules, aliases)
+
+    def lineage(self):
+        """Location keys from this one up to the root, e.g. ['fairfax_va', 'va', 'us']."""
+        keys, rule_set = [], self
+        while rule_set is not None: keys.append(rule_set.key); rule_set = rule_set.parent
+        return keys
+
+
+def _read_rule_file(path):
+    # Every failure becomes a RuleValidationError, including a file deleted or made unreadable after the startup listing
+    try:
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".json"): return json.load(f)
+            if yaml is None: raise RuleValidationError(f"{path}: PyYAML is not installed; use JSON or `pip install pyyaml`")
+            return yaml.safe_load(f)
+    except RuleValidationError: raise
+    except OSError as e: raise RuleValidationError(f"{path}: cannot read rule file: {e}")
+    except (ValueError, *YAML_ERRORS) as e: raise RuleValidationError(f"{path}: invalid {'JSON' if path.endswith('.json') else 'YAML'}: {e}")
+
+
+def _validate_aliases(path, aliases):
+    if not isinstance(aliases, dict): raise RuleValidationError(f"{path}: 'aliases' must be an object")
+    for alias, target in aliases.items():
+        if not isinstance(alias, str) or not isinstance(target, str): raise RuleValidationError(f"{path}: alias {alias!r} must map a string to a string")
+        if alias != alias.lower().strip(): raise RuleValidationError(f"{path}: alias {alias!r} must be lowercase without surrounding spaces")
+    return aliases
+
+
+def _validate_rules(path, rules, overrides=False):
+    # Files with a parent hold overrides: they may be empty and may remove an inherited item with null
+    if not isinstance(rules, dict) or not (rules or overrides): raise RuleValidationError(f"{path}: 'rules' must be a non-empty object")
+    for item, rule in rules.items():
+        if not isinstance(item, str) or item != item.lower().strip(): raise RuleValidationError(f"{path}: item {item!r} must be lowercase without surrounding spaces")
+        if rule is None and overrides: continue
+        if not isinstance(rule, dict) or not isinstance(rule.get("category"), str) or not isinstance(rule.get("notes"), str):
+            raise RuleValidationError(f"{path}: item {item!r} needs string 'category' and 'notes' fields")
+    return rules
+
+
+class RuleRegistry:
+    """Location value -> RuleSet, loaded lazily from a rules directory."""
+
+    def __init__(self, rules_dir, default_location="us", preload=False, version=1):
+        self.rules_dir = rules_dir
+        self.default_location = default_location
+        self.version = version
+        self.vocabulary = RuleVocabulary() # Per generation: records from replaced rule files are not kept after a reload
+        self._lock = threading.RLock() # Re-entered when a location loads its parent
+        self._loading = [] # Keys being loaded, for cycle detection
+        self._loaded = {}
+        self._shared_aliases = None
+        self._shared_aliases_path = None
+        self._paths = {}
+        for name in sorted(os.listdir(rules_dir)):
+            stem, ext = os.path.splitext(name)
+            if ext not in RULE_FILE_EXTENSIONS: continue
+            if stem == SHARED_ALIASES_NAME: self._shared_aliases_path = os.path.join(rules_dir, name)
+            elif stem in self._paths: raise RuleValidationError(f"{rules_dir}: location {stem!r} is defined by more than one file")
+            else: self._paths[stem] = os.path.join(rules_dir, name)
+        if default_location not in self._paths: raise RuleValidationError(f"{rules_dir}: default location {default_location!r} has no rule file")
+        if preload:
+            for key in self._paths: self.get(key)
+
+    def locations(self):
+        return list(self._paths)
+
+    def loaded_locations(self):
+        return list(self._loaded)
+
+    def __contains__(self, key):
+        return key in self._paths
+
+    def get(self, key):
+        """RuleSet for a known location value (parsed on first use); KeyError otherwise."""
+        rule_set = self._loaded.get(key)
+        if rule_set is not None: return rule_set
+        path = self._paths[key]
+        with self._lock:
+            rule_set = self._loaded.get(key)
+            if rule_set is None:
+                rule_set = self._load(key, path)
+                self._loaded[key] = rule_set
+        return rule_set
+
+    def resolve(self, key):
+        """(RuleSet, is_default) for a request's location value; unknown values use their nearest ancestor, else the default."""
+        if key in self._paths: return self.get(key), False
+        parts = key.split("_")
+        for start in range(1, len(parts)):
+            ancestor = "_".join(parts[start:])
+            if ancestor in self._paths: return self.get(ancestor), True
+        return self.get(self.default_location), True
+
+    def _shared(self):
+        if self._shared_aliases is None:
+            path = self._shared_aliases_path
+            self._shared_aliases = _validate_aliases(path, _read_rule_file(path)) if path else {}
+        return self._shared_aliases
+
+    def _load(self, key, path):
+        data = _read_rule_file(path)
+        if not isinstance(data, dict): raise RuleValidationError(f"{path}: top level must be an object")
+        parent_key = data.get("parent")
+        parent = None
+        if parent_key is not None:
+            if parent_key not in self._paths: raise RuleValidationError(f"{path}: parent {parent_key!r} has no rule file")
+            if parent_key in self._loading or parent_key == key: raise RuleValidationError(f"{path}: parent chain loops back to {parent_key!r}")
+            self._loading.append(key)
+            try: parent = self.get(parent_key)
+            finally: self._loading.pop()
+        rules = self.vocabulary.compact(_validate_rules(path, data.get("rules", {} if parent else None), overrides=parent is not None),
+                                        parent.rules if parent else None)
+        aliases = parent.aliases if parent else self._shared() # Shared dict unless this location adds its own aliases
+        if data.get("aliases"): aliases = {**aliases, **_validate_aliases(path, data["aliases"])}
+        rules_source = data.get("rules_source") or key
+        display_location = data.get("display_location") or rules_source
+        return RuleSet(key, rules_source, display_location, rules, aliases, parent)
+
+
+def rules_dir_signature(rules_dir):
+    """Cheap change detector for the watcher: (name, mtime, size) of every rule file."""
+    signature = []
+    for name in sorted(os.listdir(rules_dir)):
+        if os.path.splitext(name)[1] in RULE_FILE_EXTENSIONS:
+            st = os.stat(os.path.join(rules_dir, name))
+            signature.append((name, st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+class HotRuleRegistry:
+    """Holds the active RuleRegistry (`current`) and swaps in reloaded versions atomically.
+
+    Readers take `current` once per request and use that snapshot throughout.
+    reload() builds the next version, warms every location the old version had
+    loaded, and only then publishes it; on a bad file the old version stays.
+    """
+
+    def __init__(self, rules_dir, default_location="us", preload=False, on_swap=None):
+        self.rules_dir = rules_dir
+        self.default_location = default_location
+        self.preload = preload
+        self.on_swap = on_swap # Called with the new RuleRegistry after each swap (e.g. to clear caches)
+        self._reload_lock = threading.Lock()
+        self._signature = rules_dir_signature(rules_dir)
+        self._failed_signature = None # Watcher does not retry a broken set of files until they change again
+        self.current = RuleRegistry(rules_dir, default_location, preload, version=1)
+        self.reloads = self.failed_reloads = 0
+        self.last_error = None
+        self.last_reload_ms = None
+
+    def reload(self):
+        """Rebuild from disk and swap; returns the new RuleRegistry or raises (old version kept)."""
+        with self._reload_lock:
+            start = time.perf_counter()
+            old = self.current
+            signature = None
+            try:
+                signature = rules_dir_signature(self.rules_dir)
+                new = RuleRegistry(self.rules_dir, self.default_location, self.preload, version=old.version + 1)
+                changed = {os.path.splitext(entry[0])[0] for entry in set(signature) - set(self._signature)}
+                for key in set(old.loaded_locations()) | changed:
+                    # Build indexes now, not on the first request after the swap; edited files are validated even if unused so far
+                    if key in new: new.get(key)
+            except (OSError, ValueError) as e:
+                self._failed_signature = signature
+                self.failed_reloads += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                raise
+            self._signature = signature
+            self.current = new
+            self.reloads += 1
+            self.last_error = None
+            self.last_reload_ms = round((time.perf_counter() - start) * 1e3, 2)
+            if self.on_swap: self.on_swap(new)
+            return new
+
+    def reload_if_changed(self):
+        """Reload when a rule file was added, removed or modified since the last build."""
+        signature = rules_dir_signature(self.rules_dir)
+        if signature in (self._signature, self._failed_signature): return None
+        return self.reload()
+
+    def start_watcher(self, interval):
+        """Poll the rules directory every `interval` seconds in a daemon thread."""
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    if self.reload_if_changed(): logger.info("Rule files changed; now serving rules version %s", self.current.version)
+                except (OSError, ValueError) as e: logger.error("Rule reload failed, keeping version %s: %s", self.current.version, e)
+        thread = threading.Thread(target=watch, name="rules-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        current = self.current
+        return {"rules_version": current.version, "locations": len(current.locations()),
+                "loaded_locations": current.loaded_locations(), "reloads": self.reloads,
+                "failed_reloads": self.failed_reloads, "last_error": self.last_error, "last_reload_ms": self.last_reload_ms,
+                "vocabulary": current.vocabulary.stats()}
@@ -0,0 +1,133 @@
+# rule_store.py - Compact rule tables shared across jurisdictions
+
+# Most locations list the same items ("plastic bottle", "pizza box") and many
+# rules are word-for-word identical ("Recyclable" / "Empty and rinse."). As
+# dict-of-dicts every location kept its own key strings and its own small dict
+# per rule. Here one RuleVocabulary (per RuleRegistry generation, so a reload
+# starts a fresh one and the old records go with the old generation) gives every
+# item name an integer id and every distinct rule a single interned RuleRecord.
+# A location's CompactRules holds two parallel arrays, the sorted ids of its own
+# items and their record numbers, so it costs 8 bytes per item it lists no
+# matter how many items other locations add. Lookups are a dict probe plus a
+# binary search, and the table still reads like the old dict (`key in rules`,
+# `rules[key]["category"]`, iteration over item names), so TermIndex and
+# get_sorting_info work with either form.
+
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+RULE_FIELDS = ("category", "notes")
+
+
+class RuleRecord(Mapping):
+    """One immutable rule ({"category", "notes"} plus any extra fields), shared by every location that has it."""
+
+    __slots__ = ("category", "notes", "extra")
+
+    def __init__(self, category, notes, extra=()):
+        self.category = category
+        self.notes = notes
+        self.extra = extra # Tuple of (field, value) pairs beyond category/notes; normally empty
+
+    def __getitem__(self, field):
+        if field == "category": return self.category
+        if field == "notes": return self.notes
+        for name, value in self.extra:
+            if name == field: return value
+        raise KeyError(field)
+
+    def __iter__(self):
+        yield "category"
+        yield "notes"
+        for name, _ in self.extra: yield name
+
+    def __len__(self):
+        return 2 + len(self.extra)
+
+    def __repr__(self):
+        return f"RuleRecord({dict(self)!r})"
+
+
+class RuleVocabulary:
+    """Item names -> integer ids and deduplicated RuleRecords for one RuleRegistry generation; only grows."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.item_ids = {}  # item name -> id
+        self.items = []     # id -> item name (interned)
+        self._record_ids = {}  # (category, notes, extra) -> record number
+        self.records = []   # record number -> RuleRecord
+
+    def item_id(self, item):
+        item_id = self.item_ids.get(item)
+        if item_id is None:
+            item_id = self.item_ids[item] = len(self.items)
+            self.items.append(sys.intern(item))
+        return item_id
+
+    def record_number(self, rule):
+        extra = tuple(sorted((sys.intern(k), v) for k, v in rule.items() if k not in RULE_FIELDS))
+        key = (rule["category"], rule["notes"], extra)
+        number = self._record_ids.get(key)
+        if number is None:
+            number = self._record_ids[key] = len(self.records)
+            self.records.append(RuleRecord(sys.intern(rule["category"]), sys.intern(rule["notes"]), extra))
+        return number
+
+    def compact(self, rules, parent=None):
+        """CompactRules for a validated {item: {"category", "notes", ...}} dict.
+
+        With a parent CompactRules, rules are overrides applied over the
+        parent's items; a None rule removes an inherited item.
+        """
+        with self._lock:
+            numbered = [(self.item_id(item), None if rule is None else self.record_number(rule)) for item, rule in rules.items()]
+        slots = dict(zip(parent._ids, parent._numbers)) if parent is not None else {}
+        for item_id, number in numbered:
+            if number is None: slots.pop(item_id, None)
+            else: slots[item_id] = number
+        ids = sorted(slots)
+        return CompactRules(self, array("I", ids), array("I", [slots[item_id] for item_id in ids]))
+
+    def stats(self):
+        return {"items": len(self.items), "records": len(self.records)}
+
+
+class CompactRules(Mapping):
+    """Read-only item -> RuleRecord view of one location, backed by its registry's vocabulary."""
+
+    __slots__ = ("_vocabulary", "_ids", "_numbers")
+
+    def __init__(self, vocabulary, ids, numbers):
+        self._vocabulary = vocabulary
+        self._ids = ids         # Sorted item ids this location lists
+        self._numbers = numbers # Record number for each of them
+
+    def _number(self, item):
+        item_id = self._vocabulary.item_ids.get(item)
+        if item_id is None: return None
+        ids = self._ids
+        i = bisect_left(ids, item_id)
+        return self._numbers[i] if i < len(ids) and ids[i] == item_id else None
+
+    def __getitem__(self, item):
+        number = self._number(item)
+        if number is None: raise KeyError(item)
+        return self._vocabulary.records[number]
+
+    def __contains__(self, item):
+        return self._number(item) is not None
+
+    def get(self, item, default=None):
+        number = self._number(item)
+        return default if number is None else self._vocabulary.records[number]
+
+    def __iter__(self):
+        items = self._vocabulary.items
+        return (items[item_id] for item_id in self._ids)
+
+    def __len__(self):
+        return len(self._ids)
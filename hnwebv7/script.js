@@ -125,7 +125,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // --- Text Search API Call ---
     async function fetchTextResults(query, location) {
         resultsOutput.innerHTML = '<p><i>Searching rules...</i></p>';
-        let apiUrl = `http://127.0.0.1:5000/sort?query=${encodeURIComponent(query)}`;
+        let apiUrl = `http://127.0.0.1:5000/sort?multi=1&query=${encodeURIComponent(query)}`; // multi=1: every item in the query
         if (location) { apiUrl += `&location=${encodeURIComponent(location)}`; }
 
         try {
@@ -153,6 +153,15 @@ document.addEventListener('DOMContentLoaded', () => {
          html += `<p><strong>Location:</strong> ${escapeHTML(data.location)}</p><hr>`;
          switch (data.status) {
               case 'found':
+                 if (data.items && data.items.length > 1) { // Several items named ("pizza box and plastic bag"): one block each
+                     data.items.forEach(item => {
+                         html += `<p><strong>Identified:</strong> ${escapeHTML(item.keyword_identified)}${item.alias_resolution ? ` <em>(Interpreted as: ${escapeHTML(item.alias_resolution)})</em>` : ''}</p>`;
+                         html += `<p class="category-${item.category.toLowerCase().replace('/','-').replace(' ','-')}"><strong>Category:</strong> ${escapeHTML(item.category)}</p>`;
+                         html += `<p><strong>Notes:</strong> ${escapeHTML(item.notes || 'N/A')}</p><hr>`;
+                     });
+                     html += `<p><em>(Based on ${escapeHTML(data.rules_source || 'Selected Location')} Rules)</em></p>`;
+                     break;
+                 }
                  html += `<p><strong>Identified:</strong> ${escapeHTML(data.keyword_identified)}</p>`;
                  if (data.alias_resolution) html += `<p><em>(Interpreted as: ${escapeHTML(data.alias_resolution)})</em></p>`;
                  html += `<p class="category-${data.category.toLowerCase().replace('/','-').replace(' ','-')}"><strong>Category:</strong> ${escapeHTML(data.category)}</p>`;
@@ -271,6 +280,7 @@ document.addEventListener('DOMContentLoaded', () => {
     async function uploadAndAnalyze(formData) {
         resultsOutput.innerHTML = '<p><i>Uploading & Analyzing Image...</i></p>';
         const apiUrl = 'http://127.0.0.1:5000/analyze_image';
+        if (locationSelect && locationSelect.value) { formData.append('location', locationSelect.value); } // Classify by that location's rules when they list the object
 
         try {
             // No Auth header needed
@@ -295,7 +305,10 @@ document.addEventListener('DOMContentLoaded', () => {
            else {
                 html += `<p><strong>Object:</strong> ${escapeHTML(data.object || 'N/A')}</p>`;
                 html += `<p class="category-${(data.classification || 'unknown').toLowerCase().replace('/','-').replace(' ','-')}"><strong>Classification:</strong> ${escapeHTML(data.classification || 'N/A')}</p>`;
+                if (data.rule_category) { html += `<p><strong>Local Category:</strong> ${escapeHTML(data.rule_category)}</p>`; }
                 html += `<p><strong>Reason:</strong> ${escapeHTML(data.reason || 'N/A')}</p>`;
+                if (typeof data.confidence === 'number') { html += `<p><strong>Confidence:</strong> ${Math.round(data.confidence * 100)}%</p>`; }
+                if (data.source === 'rules') { html += `<p><em>(Based on ${escapeHTML(data.rules_source || 'Selected Location')} Rules)</em></p>`; }
            }
            if(resultsOutput) resultsOutput.innerHTML = html;
      }
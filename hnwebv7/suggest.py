@@ -0,0 +1,74 @@
+# suggest.py - "Did you mean ...?" engine for the /sort miss path
+
+# difflib.get_close_matches runs real_quick_ratio/quick_ratio/ratio against
+# every term on every miss. SuggestionIndex keeps character-count postings per
+# location so the quick_ratio upper bound for all terms is computed with a few
+# C-level Counter updates. SequenceMatcher.ratio then runs best-first and stops
+# as soon as no remaining term can enter the top n, so only a small candidate
+# set is ever scored. Results are identical to get_close_matches.
+
+import difflib
+import heapq
+from collections import Counter, defaultdict
+
+
+class SuggestionIndex:
+    """Close-match lookup over a fixed term list, parity with difflib."""
+
+    __slots__ = ("terms", "_lengths", "_postings")
+
+    def __init__(self, terms):
+        self.terms = tuple(terms)
+        self._lengths = [len(t) for t in self.terms]
+        # (char, k) -> ids of terms containing char at least k times. Summing
+        # hits over k = 1..count-in-query gives the multiset intersection size
+        # quick_ratio is built on.
+        postings = defaultdict(list)
+        for term_id, term in enumerate(self.terms):
+            for ch, count in Counter(term).items():
+                for k in range(1, count + 1):
+                    postings[(ch, k)].append(term_id)
+        self._postings = {key: tuple(ids) for key, ids in postings.items()}
+
+    def candidates(self, query, cutoff=0.6):
+        """(quick_ratio upper bound, term id) for every term that can reach cutoff."""
+        lengths = self._lengths
+        query_len = len(query)
+        if cutoff <= 0.0:
+            shared = Counter(dict.fromkeys(range(len(self.terms)), 0))
+        else:
+            shared = Counter()
+        postings = self._postings
+        for ch, count in Counter(query).items():
+            for k in range(1, count + 1):
+                ids = postings.get((ch, k))
+                if ids is None: break
+                shared.update(ids)
+        bounds = []
+        for term_id, matches in shared.items():
+            bound = 2.0 * matches / (query_len + lengths[term_id]) if query_len + lengths[term_id] else 1.0
+            if bound >= cutoff: bounds.append((bound, term_id))
+        return bounds
+
+    def close_matches(self, query, n=3, cutoff=0.6):
+        """Drop-in for difflib.get_close_matches(query, self.terms, n, cutoff)."""
+        if not n > 0: raise ValueError("n must be > 0: %r" % (n,))
+        if not 0.0 <= cutoff <= 1.0: raise ValueError("cutoff must be in [0.0, 1.0]: %r" % (cutoff,))
+        s = difflib.SequenceMatcher()
+        s.set_seq2(query)
+        terms = self.terms
+        # Best-first over the upper bound: once the bound drops below the n-th
+        # best real ratio, no remaining term can enter the top n.
+        top = []
+        for bound, term_id in sorted(self.candidates(query, cutoff), reverse=True):
+            if len(top) == n and bound < top[0][0]: break
+            s.set_seq1(terms[term_id])
+            if s.real_quick_ratio() >= cutoff:
+                score = s.ratio()
+                if score >= cutoff:
+                    if len(top) < n: heapq.heappush(top, (score, terms[term_id]))
+                    else: heapq.heappushpop(top, (score, terms[term_id]))
+        return [x for score, x in sorted(top, reverse=True)]
+
+    def __len__(self):
+        return len(self.terms)
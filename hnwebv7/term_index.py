@@ -0,0 +1,91 @@
+# term_index.py - Precompiled term lookup for the /sort text search
+
+# get_sorting_info used to merge rules + aliases, sort them by length and run
+# `term in query` for every term on every request. TermIndex does that work
+# once per location at startup and finds the longest matching term with a
+# single Aho-Corasick pass over the query. The fuzzy fallback used on a miss
+# (see suggest.py) and the word-level multi-item matcher (see query_tokens.py)
+# are built alongside it.
+
+from query_tokens import TokenIndex
+from suggest import SuggestionIndex
+
+
+class TermIndex:
+    """Immutable merged rules+aliases table with a multi-pattern matcher."""
+
+    __slots__ = ("rules", "aliases", "terms", "suggestion_index", "token_index", "_goto", "_best")
+
+    def __init__(self, rules, aliases):
+        self.rules = rules
+        self.aliases = aliases
+        # Same ordering the old per-request code used: longest terms first.
+        # It is also the tie-breaker when two equally long terms both match, so
+        # equal lengths are ordered alphabetically rather than by set (hash seed)
+        # order; otherwise the answer could change from one process to the next.
+        self.terms = tuple(sorted(set(rules).union(aliases), key=lambda term: (-len(term), term)))
+        self._build()
+        self.suggestion_index = SuggestionIndex(self.terms)
+        self.token_index = TokenIndex(self.terms, rules)
+
+    def _build(self):
+        goto = [{}]     # node -> {char: next node}
+        own = [None]    # node -> rank of the term ending exactly here
+        for rank, term in enumerate(self.terms):
+            node = 0
+            for ch in term:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    own.append(None)
+                node = nxt
+            own[node] = rank
+
+        # Breadth-first pass: failure links, then fold the best match found
+        # along each failure chain into the node so the scan never walks it.
+        fail = [0] * len(goto)
+        best = list(own)
+        queue = list(goto[0].values())
+        for node in queue:
+            for ch, nxt in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                if node:
+                    fail[nxt] = goto[f].get(ch, 0)
+                queue.append(nxt)
+        for node in queue:
+            inherited = best[fail[node]]
+            if inherited is not None and (best[node] is None or inherited < best[node]):
+                best[node] = inherited
+
+        # Copy transitions reachable through non-root failure links into each
+        # node, so scanning is at most two dict probes per query character.
+        for node in queue:
+            f = fail[node]
+            if f:
+                for ch, nxt in goto[f].items():
+                    goto[node].setdefault(ch, nxt)
+        self._goto = goto
+        self._best = best
+
+    def find(self, query):
+        """Return the longest term contained in query, or None."""
+        goto = self._goto
+        root = goto[0]
+        best = self._best
+        node = 0
+        found = None
+        for ch in query:
+            node = goto[node].get(ch)
+            if node is None:
+                node = root.get(ch, 0)
+            rank = best[node]
+            if rank is not None and (found is None or rank < found):
+                found = rank
+        return None if found is None else self.terms[found]
+
+    def __len__(self):
+        return len(self.terms)
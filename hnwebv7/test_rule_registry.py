@@ -0,0 +1,25 @@
+# test_rule_registry.py - Layered rule files: base layers hold what the counties share
+#
+# Run from the hnwebv7 folder:  python -m pytest -q
+
+import os
+
+from rule_registry import RuleRegistry
+
+RULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules")
+COMMON_ITEMS = ("plastic bottle", "glass jar", "aluminum can", "cardboard box", "battery", "electronics", "styrofoam", "pizza box")
+
+
+def test_unknown_locations_resolve_common_items():
+    registry = RuleRegistry(RULES_DIR)
+    for location, ancestor in (("reston_va", "va"), ("bethesda_md", "md"), ("austin_tx", "us")):
+        rule_set, is_default = registry.resolve(location)
+        assert is_default and rule_set.key == ancestor
+        for item in COMMON_ITEMS: assert item in rule_set.rules, (location, item)
+
+
+def test_national_layer_holds_items_every_location_shares():
+    registry = RuleRegistry(RULES_DIR)
+    leaves = [key for key in registry.locations() if registry.get(key).parent is not None and key not in ("va", "md")]
+    shared = set.intersection(*(set(registry.get(key).rules) for key in leaves))
+    assert shared <= set(registry.get("us").rules)
@@ -0,0 +1,50 @@
+# vision_loader.py - Build the vision model on first use or in a warm-up thread, not at import time
+
+# Importing google.generativeai takes most of a second and the text endpoints
+# never need it. app.py hands a factory to LazyVisionModel; /sort can serve as
+# soon as Flask is up while the vision stack loads in the background (or on
+# the first /analyze_image call), and /ready reports both sides separately.
+
+import threading
+import time
+
+
+class LazyVisionModel:
+    """Calls factory() once, on the first get() or in warm_in_background(); a None result means unavailable."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._model = None
+        self.state = "not_loaded" # not_loaded -> loading -> ready | failed
+        self.error = None
+        self.load_ms = None
+
+    def get(self):
+        """The model, building it now if needed (blocks while another thread builds it); None if loading failed."""
+        if self.state == "ready": return self._model
+        with self._lock:
+            if self.state in ("not_loaded", "loading"): self._load()
+        return self._model
+
+    def _load(self):
+        self.state = "loading"
+        start = time.perf_counter()
+        try: model = self.factory()
+        except Exception as e: model, self.error = None, f"{type(e).__name__}: {e}"
+        self.load_ms = round((time.perf_counter() - start) * 1e3, 2)
+        self._model = model
+        if model is None and self.error is None: self.error = "Vision model factory returned no model"
+        self.state = "ready" if model is not None else "failed"
+
+    def warm_in_background(self):
+        thread = threading.Thread(target=self.get, name="vision-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def status(self):
+        return {"ready": self.ready, "state": self.state, "load_ms": self.load_ms, "error": self.error}